@@ -1,44 +1,395 @@
+import functools
+import math
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import streamlit as st
-from task_prioritizer import run_task_prioritizer
-from graph_visualization import visualize_graph
+import pandas as pd
+from task_prioritizer import build_task_prioritizer_graph, stream_task_prioritizer
 import base64
+import hashlib
 import supabase_client as sb
-from datetime import datetime
-import langserve_client as lsc
+from datetime import datetime, timedelta
+from date_utils import parse_due_date
+
+# RLS setup instructions shown when saving tasks hits a row-level security error
+try:
+    _SUPABASE_SETUP_SQL = Path('supabase_setup.sql').read_text()
+except FileNotFoundError:
+    _SUPABASE_SETUP_SQL = ''
 
 # Define theme configurations
+_THEMES = {
+    "default": {
+        "primaryColor": "#FF4B4B",
+        "backgroundColor": "#FFFFFF",
+        "secondaryBackgroundColor": "#F0F2F6",
+        "textColor": "#31333F",
+        "font": "sans serif"
+    },
+    "dark": {
+        "primaryColor": "#FF4B4B",
+        "backgroundColor": "#0E1117",
+        "secondaryBackgroundColor": "#262730",
+        "textColor": "#FAFAFA",
+        "font": "sans serif"
+    },
+    "light": {
+        "primaryColor": "#FF4B4B",
+        "backgroundColor": "#FFFFFF",
+        "secondaryBackgroundColor": "#F0F2F6",
+        "textColor": "#31333F",
+        "font": "sans serif"
+    },
+    "custom": {
+        "primaryColor": "#4287F5",
+        "backgroundColor": "#F0F8FF",
+        "secondaryBackgroundColor": "#E1F1FF",
+        "textColor": "#0A2F5E",
+        "font": "sans serif"
+    }
+}
+
+# Available themes for the sidebar selector
+_THEME_LABELS = {
+    "default": "Default",
+    "dark": "Dark Mode",
+    "light": "Light Mode",
+    "custom": "Custom Blue"
+}
+_THEME_NAMES = tuple(_THEME_LABELS)
+_THEME_INDEX = {name: i for i, name in enumerate(_THEME_NAMES)}
+
+@functools.lru_cache(maxsize=None)
 def get_theme_config(theme_name):
-    themes = {
-        "default": {
-            "primaryColor": "#FF4B4B",
-            "backgroundColor": "#FFFFFF",
-            "secondaryBackgroundColor": "#F0F2F6",
-            "textColor": "#31333F",
-            "font": "sans serif"
+    return _THEMES.get(theme_name, _THEMES["default"])
+
+# Streamlit config option names for each theme setting
+_THEME_OPTION_KEYS = tuple((key, f"theme.{key}") for key in _THEMES["default"])
+
+def apply_theme(theme_name):
+    """Apply a theme using Streamlit's theming system, skipping it if already applied."""
+    if st.session_state.get('_applied_theme') == theme_name:
+        return
+    theme_config = get_theme_config(theme_name)
+    for key, option in _THEME_OPTION_KEYS:
+        st.config.set_option(option, theme_config[key])
+    st.session_state._applied_theme = theme_name
+
+# Sidebar theme preview swatch, filled in from a theme config
+_THEME_PREVIEW_HTML = """<div style="padding: 10px; border-radius: 5px; background-color: {backgroundColor}; color: {textColor}; margin-top: 10px;">
+            <div style="font-weight: bold; margin-bottom: 5px;">Theme Preview</div>
+            <div style="display: flex; gap: 5px;">
+                <div style="width: 20px; height: 20px; background-color: {primaryColor}; border-radius: 3px;"></div>
+                <div style="width: 20px; height: 20px; background-color: {secondaryBackgroundColor}; border: 1px solid #ccc; border-radius: 3px;"></div>
+                <div style="width: 20px; height: 20px; color: {textColor}; text-align: center; font-weight: bold;">T</div>
+            </div>
+        </div>"""
+
+@functools.lru_cache(maxsize=None)
+def get_theme_preview_html(theme_name):
+    return _THEME_PREVIEW_HTML.format(**get_theme_config(theme_name))
+
+# Importance levels in display order, with an index lookup for select boxes
+_IMPORTANCE_OPTIONS = ("High", "Medium", "Low")
+_IMPORTANCE_IDX = {level: i for i, level in enumerate(_IMPORTANCE_OPTIONS)}
+
+# Vega-Lite chart specs for the analytics and calendar tabs; data is supplied at render time
+PIE_SPEC = {
+    "mark": "arc",
+    "encoding": {
+        "theta": {"field": "Count", "type": "quantitative"},
+        "color": {
+            "field": "Status",
+            "type": "nominal",
+            "scale": {"domain": ["Completed", "Open"], "range": ["#28a745", "#dc3545"]}
         },
-        "dark": {
-            "primaryColor": "#FF4B4B",
-            "backgroundColor": "#0E1117",
-            "secondaryBackgroundColor": "#262730",
-            "textColor": "#FAFAFA",
-            "font": "sans serif"
+        "tooltip": [
+            {"field": "Status", "type": "nominal"},
+            {"field": "Count", "type": "quantitative"}
+        ]
+    },
+    "width": 300,
+    "height": 300
+}
+
+BAR_SPEC = {
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "Importance", "type": "nominal", "sort": ["High", "Medium", "Low"]},
+        "y": {"field": "Count", "type": "quantitative"},
+        "color": {
+            "field": "Importance",
+            "type": "nominal",
+            "scale": {"domain": ["High", "Medium", "Low"], "range": ["#dc3545", "#ffc107", "#28a745"]}
         },
-        "light": {
-            "primaryColor": "#FF4B4B",
-            "backgroundColor": "#FFFFFF",
-            "secondaryBackgroundColor": "#F0F2F6",
-            "textColor": "#31333F",
-            "font": "sans serif"
+        "tooltip": [
+            {"field": "Importance", "type": "nominal"},
+            {"field": "Count", "type": "quantitative"}
+        ]
+    },
+    "width": 500
+}
+
+LINE_SPEC = {
+    "mark": {"type": "line", "point": True},
+    "encoding": {
+        "x": {"field": "Date", "type": "temporal"},
+        "y": {"field": "Count", "type": "quantitative"},
+        "color": {
+            "field": "Type",
+            "type": "nominal",
+            "scale": {"domain": ["Total", "Completed"], "range": ["#007bff", "#28a745"]}
         },
-        "custom": {
-            "primaryColor": "#4287F5",
-            "backgroundColor": "#F0F8FF",
-            "secondaryBackgroundColor": "#E1F1FF",
-            "textColor": "#0A2F5E",
-            "font": "sans serif"
-        }
+        "tooltip": [
+            {"field": "Date", "type": "nominal"},
+            {"field": "Type", "type": "nominal"},
+            {"field": "Count", "type": "quantitative"}
+        ]
+    },
+    "width": 600,
+    "height": 300
+}
+
+HEATMAP_SPEC = {
+    "mark": "rect",
+    "encoding": {
+        "x": {
+            "field": "weekday",
+            "type": "ordinal",
+            "title": "Day of Week",
+            "sort": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        },
+        "y": {"field": "week", "type": "ordinal", "title": "Week of Month"},
+        "color": {"field": "count", "type": "quantitative", "scale": {"scheme": "blues"}, "title": "Task Count"},
+        "tooltip": [
+            {"field": "date", "type": "nominal"},
+            {"field": "count", "type": "quantitative"}
+        ]
+    },
+    "width": 600,
+    "height": 300
+}
+
+# Number of tasks shown per page in the Manage Tasks tab
+TASKS_PAGE_SIZE = 25
+
+# Cached Supabase reads so reruns don't refetch unchanged data
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_get_tasks_page(user_id, offset, limit):
+    return sb.get_tasks_page(user_id, offset, limit)
+
+# Every write moves the watermark, so bound the cache to evict stale versions
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def compute_stats(watermark, user_id):
+    """Compute task statistics and chart data; the watermark keys the cache to the data version."""
+    stats = sb.get_task_stats(user_id)
+    dates = stats['completion_data']['dates']
+    stats['charts'] = {
+        'status': pd.DataFrame({
+            'Status': ['Completed', 'Open'],
+            'Count': [stats['completed_tasks'], stats['open_tasks']]
+        }),
+        'importance': pd.DataFrame({
+            'Importance': _IMPORTANCE_OPTIONS,
+            'Count': [stats['importance_counts'].get(level, 0) for level in _IMPORTANCE_OPTIONS]
+        }),
+        'completion': pd.DataFrame({
+            'Date': dates * 2,
+            'Count': stats['completion_data']['total'] + stats['completion_data']['completed'],
+            'Type': ['Total'] * len(dates) + ['Completed'] * len(dates)
+        })
     }
-    return themes.get(theme_name, themes["default"])
+    return stats
+
+def _cached_get_task_stats(user_id):
+    return compute_stats(sb.get_tasks_watermark(user_id), user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_get_user_preferences(user_id):
+    return sb.get_user_preferences(user_id)
+
+@st.cache_resource
+def get_fetch_pool():
+    """Thread pool shared across reruns for concurrent Supabase fetches."""
+    return ThreadPoolExecutor(max_workers=8)
+
+@st.cache_data
+def _tasks_dataframe(tasks):
+    """Build the Manage Tasks table from a list of task dicts."""
+    return pd.DataFrame(
+        tasks,
+        columns=['id', 'completed', 'description', 'tags', 'importance', 'priority_score', 'due_date']
+    )
+
+def _graph_fingerprint(graph):
+    """Hash a compiled graph's topology so identical graphs share a cache entry."""
+    graph_obj = graph.get_graph()
+    topology = (sorted(graph_obj.nodes), sorted((edge.source, edge.target) for edge in graph_obj.edges))
+    return hashlib.md5(repr(topology).encode()).hexdigest()
+
+@st.cache_data
+def _render_graph_png(graph_hash, _graph):
+    """Render a graph to PNG bytes and their base64 encoding, cached by graph fingerprint."""
+    # Imported lazily so sessions that never visualize skip loading it
+    from graph_visualization import visualize_graph
+    img_bytes = visualize_graph(_graph)
+    return img_bytes, base64.b64encode(img_bytes).decode()
+
+# Short-lived caches for reads that rapid reruns would otherwise repeat
+@st.cache_data(ttl=10, show_spinner=False)
+def _cached_tasks_by_date(user_id, date_str):
+    return sb.get_tasks_by_date(user_id, date_str)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_api_health():
+    import langserve_client as lsc
+    return lsc.check_api_health()
+
+def _invalidate_task_caches():
+    """Drop cached task reads after a write."""
+    _cached_get_tasks_page.clear()
+    _cached_tasks_by_date.clear()
+
+@st.fragment
+def _edit_task_form(task, user_id):
+    """Render the edit form for a task as a fragment, so it reruns without the rest of the app."""
+    ss = st.session_state
+    st.subheader("Edit Task")
+
+    with st.form(key=f"edit_form_{task['id']}"):
+        description = st.text_input("Description", value=task['description'])
+
+        # Convert existing due date to a date object if it exists
+        default_date = parse_due_date(task['due_date'])
+
+        # Use date picker instead of text input
+        due_date_obj = st.date_input("Due Date", value=default_date)
+        # Convert the date object to string format
+        due_date = due_date_obj.strftime("%Y-%m-%d") if due_date_obj else ""
+
+        # Convert tags list to comma-separated string for editing
+        tags_str = ", ".join(task['tags'])
+        tags_input = st.text_input("Tags (comma-separated)", value=tags_str)
+
+        importance = st.selectbox(
+            "Importance",
+            options=_IMPORTANCE_OPTIONS,
+            index=_IMPORTANCE_IDX.get(task['importance'], 0)
+        )
+
+        priority_score = st.slider("Priority Score", min_value=1.0, max_value=10.0, value=float(task['priority_score']), step=0.1)
+        completed = st.checkbox("Completed", value=task['completed'])
+
+        submit = st.form_submit_button("Save Changes")
+        cancel = st.form_submit_button("Cancel")
+
+        if submit:
+            # Create a unique key for tracking update operation state
+            update_key = f"update_state_{task['id']}"
+
+            # Initialize the update state if it doesn't exist
+            if update_key not in ss:
+                ss[update_key] = "updating"
+
+                # Process tags - split by comma and strip whitespace
+                tags = [tag.strip() for tag in tags_input.split(",") if tag.strip()]
+
+                # Show updating spinner
+                with st.spinner("Updating task..."):
+                    try:
+                        # Update task
+                        updated = sb.update_task(task['id'], {
+                            'description': description,
+                            'due_date': due_date,
+                            'tags': tags,
+                            'importance': importance,
+                            'priority_score': priority_score,
+                            'completed': completed
+                        }, user_id)
+
+                        if updated:
+                            _invalidate_task_caches()
+
+                            # Update the task in session state to reflect changes immediately,
+                            # mutating the shared task dict rather than building a new one
+                            if 'tasks_cache' not in ss:
+                                ss.tasks_cache = {}
+                            cached = ss.tasks_cache.setdefault(task['id'], task)
+                            cached.update(
+                                description=description,
+                                due_date=due_date,
+                                tags=tags,
+                                importance=importance,
+                                priority_score=priority_score,
+                                completed=completed
+                            )
+
+                            st.success("Task updated successfully!")
+                            # Remove editing state and refresh
+                            del ss.editing_task
+                            del ss[update_key]
+                            # Set flag to refresh stats
+                            ss.refresh_stats = True
+                            st.rerun()
+                        else:
+                            st.error("Failed to update task.")
+                            del ss[update_key]
+                    except Exception as e:
+                        st.error(f"Error updating task: {str(e)}")
+                        del ss[update_key]
+
+        if cancel:
+            del ss.editing_task
+            st.rerun()
+
+@st.fragment
+def _calendar_day_view(user_id):
+    """Render the calendar date picker and that day's tasks; picking a date only reruns this fragment."""
+    # Create calendar view
+    st.subheader("Select a date to view tasks")
+
+    # Date picker for selecting a date
+    selected_date = st.date_input("Select Date", value=datetime.now().date())
+    selected_date_str = selected_date.strftime("%Y-%m-%d")
+
+    # Display tasks for selected date
+    st.subheader(f"Tasks for {selected_date_str}")
+
+    # Get tasks for the selected date
+    date_tasks = _cached_tasks_by_date(user_id, selected_date_str)
+
+    if date_tasks:
+        for task in date_tasks:
+            with st.expander(f"{task['description']} ({task['importance']})"):
+                # Render the static details as a single markdown element
+                details = [
+                    f"**Priority Score:** {task['priority_score']:.1f}",
+                    f"**Status:** {'Completed' if task['completed'] else 'Open'}"
+                ]
+                if task['tags']:
+                    details.append(f"**Tags:** {', '.join('#' + tag for tag in task['tags'])}")
+                st.markdown("\n\n".join(details))
+
+                # Add quick actions
+                cols = st.columns(2)
+                with cols[0]:
+                    if st.button("Mark Complete", key=f"complete_{task['id']}"):
+                        if sb.update_task(task['id'], {'completed': True}, user_id):
+                            _invalidate_task_caches()
+                            st.success("Task marked as complete!")
+                            # Set flag to refresh stats
+                            st.session_state.refresh_stats = True
+                            st.rerun()
+                with cols[1]:
+                    if st.button("Edit", key=f"cal_edit_{task['id']}"):
+                        st.session_state.editing_task = task
+                        # Switch to Manage Tasks tab
+                        st.query_params['tab'] = "manage"
+                        st.rerun()
+    else:
+        st.info(f"No tasks due on {selected_date_str}. Select another date or add tasks with this due date.")
 
 # Set up the Streamlit page
 st.set_page_config(
@@ -49,18 +400,36 @@ st.set_page_config(
 
 # Apply theme from session state if available
 if 'user_preferences' in st.session_state and 'theme' in st.session_state.user_preferences:
-    theme_name = st.session_state.user_preferences['theme']
-    theme_config = get_theme_config(theme_name)
-
-    # Apply the theme using Streamlit's theming system
-    for key, value in theme_config.items():
-        st.config.set_option(f"theme.{key}", value)
+    apply_theme(st.session_state.user_preferences['theme'])
 
 # Create the main UI
 st.title("📋 Personal Task Prioritizer")
 
 # Authentication handling
-if "user" not in st.session_state:
+# Password reset link: only the new password form is needed, so skip the auth tabs
+if "user" not in st.session_state and st.query_params.get('type') == 'recovery':
+    st.subheader("Reset Your Password")
+    # Show password reset form
+    st.info("Enter your new password below.")
+
+    with st.form("new_password_form"):
+        new_password = st.text_input("New Password", type="password")
+        confirm_password = st.text_input("Confirm New Password", type="password")
+        reset_button = st.form_submit_button("Reset Password")
+
+        if reset_button:
+            if not new_password or not confirm_password:
+                st.error("Please enter and confirm your new password")
+            elif new_password != confirm_password:
+                st.error("Passwords do not match")
+            else:
+                try:
+                    response = sb.update_password(new_password)
+                    st.success("Password has been reset successfully!")
+                    st.info("You can now log in with your new password.")
+                except Exception as e:
+                    st.error(f"Failed to reset password: {str(e)}")
+elif "user" not in st.session_state:
     # Show tabs for login/signup
     auth_tab1, auth_tab2, auth_tab3, auth_tab4 = st.tabs(["Login", "Sign Up", "Login with Google", "Reset Password"])
 
@@ -88,7 +457,6 @@ if "user" not in st.session_state:
                             st.error(f"Login failed: Invalid response from authentication service")
                             st.info(f"Response structure: {type(response).__name__}")
                 except Exception as e:
-                    import traceback
                     error_details = traceback.format_exc()
                     st.error(f"### Login Error\n\n**Error Type:** {type(e).__name__}\n\n**Error Message:** {str(e)}\n\n**Stack Trace:**\n```python\n{error_details}\n```")
                     st.info("Check your credentials and make sure your Supabase project is properly configured.")
@@ -130,7 +498,6 @@ if "user" not in st.session_state:
                 else:
                     st.error("Failed to generate Google sign-in URL. Please try again later.")
             except Exception as e:
-                import traceback
                 error_details = traceback.format_exc()
                 st.error(f"### Google Login Error\n\n**Error Type:** {type(e).__name__}\n\n**Error Message:** {str(e)}\n\n**Stack Trace:**\n```python\n{error_details}\n```")
 
@@ -166,7 +533,6 @@ if "user" not in st.session_state:
                             st.warning(f"Sign up may have been successful, but the response was unexpected.")
                             st.info(f"Response type: {type(response).__name__}")
                     except Exception as e:
-                        import traceback
                         error_details = traceback.format_exc()
                         st.error(f"### Sign Up Error\n\n**Error Type:** {type(e).__name__}\n\n**Error Message:** {str(e)}\n\n**Stack Trace:**\n```python\n{error_details}\n```")
 
@@ -182,65 +548,51 @@ if "user" not in st.session_state:
     with auth_tab4:
         st.subheader("Reset Your Password")
 
-        # Check if we're in password reset mode (after clicking link in email)
-        query_params = st.query_params
-        if 'type' in query_params and query_params.get('type') == 'recovery':
-            # Show password reset form
-            st.info("Enter your new password below.")
-
-            with st.form("new_password_form"):
-                new_password = st.text_input("New Password", type="password")
-                confirm_password = st.text_input("Confirm New Password", type="password")
-                reset_button = st.form_submit_button("Reset Password")
-
-                if reset_button:
-                    if not new_password or not confirm_password:
-                        st.error("Please enter and confirm your new password")
-                    elif new_password != confirm_password:
-                        st.error("Passwords do not match")
-                    else:
-                        try:
-                            response = sb.update_password(new_password)
-                            st.success("Password has been reset successfully!")
-                            st.info("You can now log in with your new password.")
-                        except Exception as e:
-                            st.error(f"Failed to reset password: {str(e)}")
-        else:
-            # Show request password reset form
-            st.write("Forgot your password? Enter your email to receive a password reset link.")
+        # Show request password reset form
+        st.write("Forgot your password? Enter your email to receive a password reset link.")
 
-            with st.form("reset_password_form"):
-                email = st.text_input("Email")
-                reset_button = st.form_submit_button("Send Reset Link")
+        with st.form("reset_password_form"):
+            email = st.text_input("Email")
+            reset_button = st.form_submit_button("Send Reset Link")
 
-                if reset_button:
-                    if not email:
-                        st.error("Please enter your email address")
-                    else:
-                        try:
-                            response = sb.reset_password(email)
-                            st.success("Password reset link has been sent to your email!")
-                            st.info("Please check your email and click on the reset link.")
+            if reset_button:
+                if not email:
+                    st.error("Please enter your email address")
+                else:
+                    try:
+                        response = sb.reset_password(email)
+                        st.success("Password reset link has been sent to your email!")
+                        st.info("Please check your email and click on the reset link.")
 
-                            # Show additional instructions
-                            with st.expander("What to do next"):
-                                st.markdown("""
-                                1. Check your email inbox (and spam folder) for the reset link
-                                2. Click on the link in the email
-                                3. You'll be redirected back to this app to set a new password
-                                4. After setting a new password, you can log in with it
-                                """)
-                        except Exception as e:
-                            st.error(f"Failed to send reset link: {str(e)}")
+                        # Show additional instructions
+                        with st.expander("What to do next"):
+                            st.markdown("""
+                            1. Check your email inbox (and spam folder) for the reset link
+                            2. Click on the link in the email
+                            3. You'll be redirected back to this app to set a new password
+                            4. After setting a new password, you can log in with it
+                            """)
+                    except Exception as e:
+                        st.error(f"Failed to send reset link: {str(e)}")
 else:
     # User is logged in, show user info and settings in sidebar
     user_id = st.session_state.user.id
 
+    # Fetch independent Supabase data concurrently so their latencies overlap
+    need_stats = 'task_stats' not in st.session_state or st.session_state.get('refresh_stats', False)
+    executor = get_fetch_pool()
+    prefs_future = executor.submit(_cached_get_user_preferences, user_id) if 'user_preferences' not in st.session_state else None
+    stats_future = executor.submit(_cached_get_task_stats, user_id) if need_stats else None
+    tasks_offset = (st.session_state.get('tasks_page', 1) - 1) * TASKS_PAGE_SIZE
+    tasks_future = executor.submit(_cached_get_tasks_page, user_id, tasks_offset, TASKS_PAGE_SIZE)
+    auth_future = executor.submit(sb.get_current_user) if st.session_state.get('show_debug') else None
+
     # Get user preferences
-    if 'user_preferences' not in st.session_state:
+    if prefs_future is not None:
         # Print user info for debugging
-        print(f"Current user: {user_id}, {st.session_state.user.email}")
-        st.session_state.user_preferences = sb.get_user_preferences(user_id)
+        if os.getenv("APP_DEBUG"):
+            print(f"Current user: {user_id}, {st.session_state.user.email}")
+        st.session_state.user_preferences = prefs_future.result()
 
     st.sidebar.write(f"Logged in as: {st.session_state.user.email}")
 
@@ -248,47 +600,20 @@ else:
     st.sidebar.divider()
     st.sidebar.subheader("Theme Settings")
 
-    # Define available themes
-    themes = {
-        "default": "Default",
-        "dark": "Dark Mode",
-        "light": "Light Mode",
-        "custom": "Custom Blue"
-    }
-
     # Get current theme
     current_theme = st.session_state.user_preferences.get('theme', 'default')
 
     # Create theme selector
     selected_theme = st.sidebar.selectbox(
         "Select Theme",
-        options=list(themes.keys()),
-        format_func=lambda x: themes[x],
-        index=list(themes.keys()).index(current_theme) if current_theme in themes else 0,
+        options=_THEME_NAMES,
+        format_func=_THEME_LABELS.get,
+        index=_THEME_INDEX.get(current_theme, 0),
         key="theme_selector"
     )
 
-    # Show theme preview
-    theme_configs = {
-        "default": get_theme_config("default"),
-        "dark": get_theme_config("dark"),
-        "light": get_theme_config("light"),
-        "custom": get_theme_config("custom")
-    }
-
     # Display a preview of the selected theme
-    theme = theme_configs.get(selected_theme, theme_configs["default"])
-    st.sidebar.markdown(
-        f"""<div style="padding: 10px; border-radius: 5px; background-color: {theme['backgroundColor']}; color: {theme['textColor']}; margin-top: 10px;">
-            <div style="font-weight: bold; margin-bottom: 5px;">Theme Preview</div>
-            <div style="display: flex; gap: 5px;">
-                <div style="width: 20px; height: 20px; background-color: {theme['primaryColor']}; border-radius: 3px;"></div>
-                <div style="width: 20px; height: 20px; background-color: {theme['secondaryBackgroundColor']}; border: 1px solid #ccc; border-radius: 3px;"></div>
-                <div style="width: 20px; height: 20px; color: {theme['textColor']}; text-align: center; font-weight: bold;">T</div>
-            </div>
-        </div>""",
-        unsafe_allow_html=True
-    )
+    st.sidebar.markdown(get_theme_preview_html(selected_theme), unsafe_allow_html=True)
 
     # Add debug option
     if st.sidebar.checkbox("Show Debug Info", key="show_debug"):
@@ -296,7 +621,7 @@ else:
             "user_id": user_id,
             "email": st.session_state.user.email,
             "current_theme": current_theme,
-            "auth_status": "Authenticated" if sb.get_current_user() else "Not authenticated"
+            "auth_status": "Authenticated" if (auth_future.result() if auth_future else sb.get_current_user()) else "Not authenticated"
         })
 
     # Update theme if changed
@@ -305,11 +630,10 @@ else:
         with st.spinner("Updating theme..."):
             if sb.update_user_preferences(user_id, {'theme': selected_theme}):
                 st.session_state.user_preferences['theme'] = selected_theme
+                _cached_get_user_preferences.clear()
 
                 # Apply the theme immediately
-                theme_config = get_theme_config(selected_theme)
-                for key, value in theme_config.items():
-                    st.config.set_option(f"theme.{key}", value)
+                apply_theme(selected_theme)
 
                 st.sidebar.success("Theme updated!")
                 # Force a rerun to ensure all components update
@@ -329,8 +653,8 @@ else:
     tab1, tab2, tab3, tab4 = st.tabs(["Add Tasks", "Manage Tasks", "Analytics", "Calendar"])
 
     # Get task statistics for analytics and calendar views
-    if 'task_stats' not in st.session_state or st.session_state.get('refresh_stats', False):
-        st.session_state.task_stats = sb.get_task_stats(user_id)
+    if stats_future is not None:
+        st.session_state.task_stats = stats_future.result()
         st.session_state.refresh_stats = False
 
     with tab1:
@@ -358,8 +682,9 @@ else:
         if 'graph' not in st.session_state:
             st.session_state.graph = None
 
-        # Check if LangServe API is available
-        api_available = lsc.check_api_health()
+        # Check if LangServe API is available (client imported lazily, only once logged in)
+        import langserve_client as lsc
+        api_available = _cached_api_health()
 
         # Show API status
         api_status = st.empty()
@@ -377,15 +702,16 @@ else:
                         if api_available:
                             result, graph = lsc.call_task_prioritizer_api(user_input)
                             st.session_state.graph = None  # No graph available from API
+
+                            # Display the result
+                            st.markdown(result)
                         else:
-                            result, graph = run_task_prioritizer(user_input)
-                            st.session_state.graph = graph  # Store graph in session state
+                            # Render the formatted output as the model generates it
+                            result = st.write_stream(stream_task_prioritizer(user_input))
+                            st.session_state.graph = build_task_prioritizer_graph()  # Store graph in session state
 
                         st.session_state.last_result = result  # Store result for display
 
-                        # Display the result
-                        st.markdown(result)
-
                         # Save prioritized tasks to Supabase
                         if 'prioritized_tasks' in st.session_state:
                             try:
@@ -400,6 +726,8 @@ else:
 
                                 # Try to save tasks
                                 task_ids = sb.save_tasks(st.session_state.prioritized_tasks, user_id)
+                                _invalidate_task_caches()
+                                st.session_state.refresh_stats = True
                                 st.success(f"Saved {len(task_ids)} tasks to your account!")
                             except Exception as e:
                                 if 'violates row-level security policy' in str(e):
@@ -408,14 +736,11 @@ else:
                                     # Show SQL setup instructions
                                     with st.expander("How to Fix RLS Issues"):
                                         st.markdown("""To fix Row Level Security (RLS) issues in Supabase, run the SQL in the `supabase_setup.sql` file in your Supabase SQL editor.""")
-                                        with open('supabase_setup.sql', 'r') as f:
-                                            sql_content = f.read()
-                                        st.code(sql_content, language='sql')
+                                        st.code(_SUPABASE_SETUP_SQL, language='sql')
                                 else:
                                     # Re-raise for the general exception handler
                                     raise e
                     except Exception as e:
-                        import traceback
                         error_details = traceback.format_exc()
                         st.error(f"### Error Details\n\n**Error Type:** {type(e).__name__}\n\n**Error Message:** {str(e)}\n\n**Stack Trace:**\n```python\n{error_details}\n```")
                         st.warning("If this error persists, please contact support with the error details above.")
@@ -427,8 +752,8 @@ else:
             if st.button("Visualize Graph", key="visualize_button"):
                 with st.spinner("Generating graph visualization..."):
                     try:
-                        img_bytes = visualize_graph(st.session_state.graph)
-                        b64_img = base64.b64encode(img_bytes).decode()
+                        graph = st.session_state.graph
+                        img_bytes, b64_img = _render_graph_png(_graph_fingerprint(graph), graph)
                         st.markdown(
                             f'<img src="data:image/png;base64,{b64_img}" alt="Graph Visualization"/>',
                             unsafe_allow_html=True
@@ -440,7 +765,6 @@ else:
                             "image/png"
                         )
                     except Exception as e:
-                        import traceback
                         error_details = traceback.format_exc()
                         st.error(f"### Graph Visualization Error\n\n**Error Type:** {type(e).__name__}\n\n**Error Message:** {str(e)}\n\n**Stack Trace:**\n```python\n{error_details}\n```")
                         st.info("The graph visualization failed, but your tasks have still been prioritized successfully.")
@@ -448,299 +772,123 @@ else:
     with tab2:
         st.header("Manage Your Tasks")
 
-        # Fetch all tasks from Supabase
-        user_id = st.session_state.user.id
+        # Local alias avoids repeated session-state proxy lookups in this tab
+        ss = st.session_state
 
-        # Get tasks from Supabase
-        tasks = sb.get_all_tasks(user_id)
+        # Fetch the current page of tasks from Supabase
+        user_id = ss.user.id
+
+        # Get tasks from Supabase, refetching if tasks were saved during this run
+        if ss.get('refresh_stats', False):
+            tasks, total_tasks = _cached_get_tasks_page(user_id, tasks_offset, TASKS_PAGE_SIZE)
+        else:
+            tasks, total_tasks = tasks_future.result()
+
+        # Step back to the last page if tasks were removed from under the current one
+        page_count = max(1, math.ceil(total_tasks / TASKS_PAGE_SIZE))
+        if ss.get('tasks_page', 1) > page_count:
+            ss.tasks_page = page_count
+            tasks, total_tasks = _cached_get_tasks_page(user_id, (page_count - 1) * TASKS_PAGE_SIZE, TASKS_PAGE_SIZE)
 
         # If we have cached tasks, update the fetched tasks with the cached versions
         # This ensures immediate UI updates after editing
-        if 'tasks_cache' in st.session_state and st.session_state.tasks_cache:
-            for i, task in enumerate(tasks):
-                if task['id'] in st.session_state.tasks_cache:
-                    # Update with cached version
-                    tasks[i] = st.session_state.tasks_cache[task['id']]
+        tasks_cache = ss.get('tasks_cache')
+        if tasks_cache:
+            tasks = [tasks_cache.get(task['id'], task) for task in tasks]
 
         if not tasks:
             st.info("No tasks found. Add some tasks to get started!")
         else:
             # Display tasks with editing and status controls
-            st.write(f"You have {len(tasks)} tasks:")
-
-            # Create a table-like view with CSS
-            st.markdown("""
-            <style>
-            .task-table {
-                width: 100%;
-                border-collapse: collapse;
-                margin-bottom: 10px;
-            }
-            .task-table th {
-                background-color: var(--secondary-background-color);
-                padding: 8px 12px;
-                text-align: left;
-                font-weight: bold;
-                border-bottom: 1px solid rgba(0,0,0,0.1);
-            }
-            .task-table td {
-                padding: 12px;
-                border-bottom: 1px solid rgba(0,0,0,0.05);
-                vertical-align: middle;
-            }
-            .task-description {
-                font-weight: 500;
-            }
-            .task-due-date {
-                color: #666;
-                font-size: 0.9em;
-                font-style: italic;
-            }
-            .task-tags {
-                margin-top: 4px;
-            }
-            .task-tag {
-                background-color: #e0e0e0;
-                padding: 2px 6px;
-                border-radius: 10px;
-                margin-right: 5px;
-                font-size: 0.8em;
-            }
-            .importance-high {
-                color: #dc3545;
-                font-weight: bold;
-            }
-            .importance-medium {
-                color: #ffc107;
-                font-weight: bold;
-            }
-            .importance-low {
-                color: #28a745;
-                font-weight: bold;
-            }
-            .task-score {
-                color: #666;
-                font-size: 0.9em;
-            }
-            </style>
-
-            <table class="task-table">
-                <thead>
-                    <tr>
-                        <th style="width: 5%;">Status</th>
-                        <th style="width: 55%;">Task</th>
-                        <th style="width: 15%;">Priority</th>
-                        <th style="width: 15%;">Due Date</th>
-                        <th style="width: 10%;">Actions</th>
-                    </tr>
-                </thead>
-                <tbody>
-            """, unsafe_allow_html=True)
-
-            # Create task rows
-            for task in tasks:
-                # Create a unique key for tracking delete operation state
-                delete_key = f"delete_state_{task['id']}"
-
-                # Initialize the delete state if it doesn't exist
-                if delete_key not in st.session_state:
-                    st.session_state[delete_key] = "idle"
-
-                # Create a row for each task
-                cols = st.columns([0.05, 0.55, 0.15, 0.15, 0.1])
-
-                # Column 1: Checkbox for completion status
-                with cols[0]:
-                    completed = st.checkbox(
-                        "",
-                        value=task['completed'],
-                        key=f"task_{task['id']}",
-                        help="Mark as completed"
-                    )
-
-                    # Update task completion status if changed
-                    if completed != task['completed']:
-                        if sb.update_task(task['id'], {'completed': completed}, user_id):
-                            # Set flag to refresh stats
-                            st.session_state.refresh_stats = True
-                            st.rerun()
-
-                # Column 2: Task description and tags
-                with cols[1]:
-                    st.markdown(f"**{task['description']}**")
-
-                    # Display tags as pills
-                    if task['tags']:
-                        tags_md = " ".join([f":pill[#{tag}]" for tag in task['tags']])
-                        st.markdown(tags_md)
-
-                # Column 3: Importance and priority score
-                with cols[2]:
-                    importance_color = {
-                        'High': 'red',
-                        'Medium': 'orange',
-                        'Low': 'green'
-                    }.get(task['importance'], 'gray')
-
-                    st.markdown(
-                        f'<span style="color: {importance_color}; font-weight: bold;">{task["importance"]}</span> '
-                        f'<span style="color: gray;">({task["priority_score"]:.1f})</span>',
-                        unsafe_allow_html=True
-                    )
-
-                # Column 4: Due date
-                with cols[3]:
-                    if task['due_date']:
-                        st.write(task['due_date'])
+            st.write(f"You have {total_tasks} tasks:")
+
+            # Render all tasks in a single data editor inside a form, so status
+            # toggles are batched into one rerun when the form is submitted
+            tasks_df = _tasks_dataframe(tasks)
+            editor_key = f"tasks_editor_{ss.get('tasks_page', 1)}_{ss.get('tasks_editor_version', 0)}"
+            with st.form("manage_tasks", clear_on_submit=False):
+                edited_df = st.data_editor(
+                    tasks_df,
+                    key=editor_key,
+                    hide_index=True,
+                    use_container_width=True,
+                    disabled=[col for col in tasks_df.columns if col != 'completed'],
+                    column_order=['completed', 'description', 'tags', 'importance', 'priority_score', 'due_date'],
+                    column_config={
+                        'completed': st.column_config.CheckboxColumn("Status", help="Mark as completed"),
+                        'description': st.column_config.TextColumn("Task", width="large"),
+                        'tags': st.column_config.ListColumn("Tags"),
+                        'importance': st.column_config.TextColumn("Importance"),
+                        'priority_score': st.column_config.NumberColumn("Priority", format="%.1f"),
+                        'due_date': st.column_config.TextColumn("Due Date")
+                    }
+                )
+                save_status = st.form_submit_button("Save Status Changes")
+
+            # Page selector, only needed once tasks span several pages
+            if page_count > 1:
+                st.number_input("Page", min_value=1, max_value=page_count, step=1, key="tasks_page")
+
+            # Save completion changes made in the editor with a single batched update
+            if save_status:
+                changed = edited_df['completed'] != tasks_df['completed']
+                if changed.any():
+                    updates = {
+                        task_id: {'completed': bool(value)}
+                        for task_id, value in edited_df.loc[changed, ['id', 'completed']].itertuples(index=False)
+                    }
+                    if sb.bulk_update_tasks(updates, user_id):
+                        _invalidate_task_caches()
+                        # Reset the editor so it picks up the saved values
+                        ss.tasks_editor_version = ss.get('tasks_editor_version', 0) + 1
+                        # Set flag to refresh stats
+                        ss.refresh_stats = True
+                        st.rerun()
                     else:
-                        st.write("—")
-
-                # Column 5: Action buttons
-                with cols[4]:
-                    col5_1, col5_2 = st.columns(2)
-                    with col5_1:
-                        if st.button("✏️", key=f"edit_{task['id']}", help="Edit task"):
-                            st.session_state.editing_task = task
-                    with col5_2:
-                        # Show different buttons based on the state
-                        if st.session_state[delete_key] == "idle":
-                            if st.button("🗑️", key=f"delete_{task['id']}", help="Delete task"):
-                                # Set state to deleting and rerun to show spinner
-                                st.session_state[delete_key] = "deleting"
+                        st.error("Failed to update task status. Please try again.")
+                else:
+                    st.info("No status changes to save.")
+
+            # Edit and delete actions for a selected task
+            tasks_by_id = {task['id']: task for task in tasks}
+            action_cols = st.columns([0.8, 0.1, 0.1], vertical_alignment="bottom")
+            with action_cols[0]:
+                selected_task_id = st.selectbox(
+                    "Select a task",
+                    options=list(tasks_by_id),
+                    format_func=lambda task_id: tasks_by_id[task_id]['description'],
+                    key="selected_task"
+                )
+            with action_cols[1]:
+                if st.button("✏️", key="edit_task", help="Edit task"):
+                    ss.editing_task = tasks_by_id[selected_task_id]
+            with action_cols[2]:
+                if st.button("🗑️", key="delete_task", help="Delete task"):
+                    with st.spinner("Deleting..."):
+                        try:
+                            if sb.delete_task(selected_task_id, user_id):
+                                _invalidate_task_caches()
+                                st.success("Task deleted!")
+                                # Set flag to refresh stats
+                                ss.refresh_stats = True
                                 st.rerun()
-                        elif st.session_state[delete_key] == "deleting":
-                            with st.spinner("Deleting..."):
-                                try:
-                                    if sb.delete_task(task['id'], user_id):
-                                        st.session_state[delete_key] = "idle"
-                                        st.success("Task deleted!")
-                                        # Set flag to refresh stats
-                                        st.session_state.refresh_stats = True
-                                        st.rerun()
-                                    else:
-                                        st.session_state[delete_key] = "idle"
-                                        st.error("Failed to delete task. Please try again.")
-                                        st.rerun()
-                                except Exception as e:
-                                    st.session_state[delete_key] = "idle"
-                                    st.error(f"Error deleting task: {str(e)}")
-                                    st.rerun()
-
-                # Add a separator between tasks
-                st.markdown("<hr style='margin: 5px 0; opacity: 0.2;'>", unsafe_allow_html=True)
-
-            # Close the table
-            st.markdown("</tbody></table>", unsafe_allow_html=True)
+                            else:
+                                st.error("Failed to delete task. Please try again.")
+                        except Exception as e:
+                            st.error(f"Error deleting task: {str(e)}")
 
             # Clear all tasks button
             if st.button("Clear All Tasks", key="clear_all"):
                 if st.checkbox("I understand this will delete all tasks permanently", key="confirm_clear"):
                     deleted = sb.clear_all_tasks(user_id)
+                    _invalidate_task_caches()
+                    ss.refresh_stats = True
                     st.success(f"Deleted {deleted} tasks!")
                     st.rerun()
 
         # Task editing form
-        if 'editing_task' in st.session_state:
-            task = st.session_state.editing_task
-            st.subheader("Edit Task")
-
-            with st.form(key=f"edit_form_{task['id']}"):
-                description = st.text_input("Description", value=task['description'])
-
-                # Convert existing due date to datetime object if it exists
-                default_date = None
-                if task['due_date']:
-                    try:
-                        from datetime import datetime
-                        # Try to parse the date in various formats
-                        for fmt in ["%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%b %d, %Y"]:
-                            try:
-                                default_date = datetime.strptime(task['due_date'], fmt).date()
-                                break
-                            except ValueError:
-                                continue
-                    except Exception:
-                        pass
-
-                # Use date picker instead of text input
-                due_date_obj = st.date_input("Due Date", value=default_date)
-                # Convert the date object to string format
-                due_date = due_date_obj.strftime("%Y-%m-%d") if due_date_obj else ""
-
-                # Convert tags list to comma-separated string for editing
-                tags_str = ", ".join(task['tags'])
-                tags_input = st.text_input("Tags (comma-separated)", value=tags_str)
-
-                importance = st.selectbox(
-                    "Importance",
-                    options=["High", "Medium", "Low"],
-                    index=["High", "Medium", "Low"].index(task['importance']) if task['importance'] in ["High", "Medium", "Low"] else 0
-                )
-
-                priority_score = st.slider("Priority Score", min_value=1.0, max_value=10.0, value=float(task['priority_score']), step=0.1)
-                completed = st.checkbox("Completed", value=task['completed'])
-
-                submit = st.form_submit_button("Save Changes")
-                cancel = st.form_submit_button("Cancel")
-
-                if submit:
-                    # Create a unique key for tracking update operation state
-                    update_key = f"update_state_{task['id']}"
-
-                    # Initialize the update state if it doesn't exist
-                    if update_key not in st.session_state:
-                        st.session_state[update_key] = "updating"
-
-                        # Process tags - split by comma and strip whitespace
-                        tags = [tag.strip() for tag in tags_input.split(",") if tag.strip()]
-
-                        # Show updating spinner
-                        with st.spinner("Updating task..."):
-                            try:
-                                # Update task
-                                updated = sb.update_task(task['id'], {
-                                    'description': description,
-                                    'due_date': due_date,
-                                    'tags': tags,
-                                    'importance': importance,
-                                    'priority_score': priority_score,
-                                    'completed': completed
-                                }, user_id)
-
-                                if updated:
-                                    # Update the task in session state to reflect changes immediately
-                                    if 'tasks_cache' not in st.session_state:
-                                        st.session_state.tasks_cache = {}
-
-                                    # Update the cached task
-                                    st.session_state.tasks_cache[task['id']] = {
-                                        'id': task['id'],
-                                        'description': description,
-                                        'due_date': due_date,
-                                        'tags': tags,
-                                        'importance': importance,
-                                        'priority_score': priority_score,
-                                        'completed': completed,
-                                        'user_id': user_id
-                                    }
-
-                                    st.success("Task updated successfully!")
-                                    # Remove editing state and refresh
-                                    del st.session_state.editing_task
-                                    del st.session_state[update_key]
-                                    # Set flag to refresh stats
-                                    st.session_state.refresh_stats = True
-                                    st.rerun()
-                                else:
-                                    st.error("Failed to update task.")
-                                    del st.session_state[update_key]
-                            except Exception as e:
-                                st.error(f"Error updating task: {str(e)}")
-                                del st.session_state[update_key]
-
-                if cancel:
-                    del st.session_state.editing_task
-                    st.rerun()
+        if 'editing_task' in ss:
+            _edit_task_form(ss.editing_task, user_id)
 
     # Analytics Tab
     with tab3:
@@ -765,83 +913,24 @@ else:
 
         # Task status pie chart
         if stats['total_tasks'] > 0:
-            import altair as alt
-            import pandas as pd
-
-            # Create data for pie chart
-            status_data = pd.DataFrame({
-                'Status': ['Completed', 'Open'],
-                'Count': [stats['completed_tasks'], stats['open_tasks']]
-            })
-
-            # Create pie chart
-            pie_chart = alt.Chart(status_data).mark_arc().encode(
-                theta=alt.Theta(field="Count", type="quantitative"),
-                color=alt.Color(field="Status", type="nominal", scale=alt.Scale(
-                    domain=['Completed', 'Open'],
-                    range=['#28a745', '#dc3545']
-                )),
-                tooltip=['Status', 'Count']
-            ).properties(width=300, height=300)
-
             # Display chart
-            st.altair_chart(pie_chart, use_container_width=True)
+            st.vega_lite_chart(stats['charts']['status'], dict(PIE_SPEC), use_container_width=True)
         else:
             st.info("No tasks available for analysis. Add some tasks to see statistics.")
 
         # Task importance distribution
         st.subheader("Task Importance Distribution")
         if stats['total_tasks'] > 0:
-            # Create data for bar chart
-            importance_data = pd.DataFrame({
-                'Importance': list(stats['importance_counts'].keys()),
-                'Count': list(stats['importance_counts'].values())
-            })
-
-            # Create bar chart
-            bar_chart = alt.Chart(importance_data).mark_bar().encode(
-                x=alt.X('Importance:N', sort=['High', 'Medium', 'Low']),
-                y='Count:Q',
-                color=alt.Color('Importance:N', scale=alt.Scale(
-                    domain=['High', 'Medium', 'Low'],
-                    range=['#dc3545', '#ffc107', '#28a745']
-                )),
-                tooltip=['Importance', 'Count']
-            ).properties(width=500)
-
             # Display chart
-            st.altair_chart(bar_chart, use_container_width=True)
+            st.vega_lite_chart(stats['charts']['importance'], dict(BAR_SPEC), use_container_width=True)
         else:
             st.info("No tasks available for analysis. Add some tasks to see statistics.")
 
         # Task completion over time
         st.subheader("Task Completion Over Time")
         if stats['completion_data']['dates']:
-            # Create data for line chart
-            dates = stats['completion_data']['dates']
-            total = stats['completion_data']['total']
-            completed = stats['completion_data']['completed']
-
-            # Create DataFrame
-            time_data = pd.DataFrame({
-                'Date': dates * 2,
-                'Count': total + completed,
-                'Type': ['Total'] * len(dates) + ['Completed'] * len(dates)
-            })
-
-            # Create line chart
-            line_chart = alt.Chart(time_data).mark_line(point=True).encode(
-                x='Date:T',
-                y='Count:Q',
-                color=alt.Color('Type:N', scale=alt.Scale(
-                    domain=['Total', 'Completed'],
-                    range=['#007bff', '#28a745']
-                )),
-                tooltip=['Date', 'Type', 'Count']
-            ).properties(width=600, height=300)
-
             # Display chart
-            st.altair_chart(line_chart, use_container_width=True)
+            st.vega_lite_chart(stats['charts']['completion'], dict(LINE_SPEC), use_container_width=True)
         else:
             st.info("Not enough historical data available. Add more tasks over time to see trends.")
 
@@ -849,57 +938,17 @@ else:
     with tab4:
         st.header("Task Calendar")
 
-        # Get tasks by date from session state
-        tasks_by_date = st.session_state.task_stats['tasks_by_date']
-
-        # Create calendar view
-        st.subheader("Select a date to view tasks")
-
-        # Date picker for selecting a date
-        selected_date = st.date_input("Select Date", value=datetime.now().date())
-        selected_date_str = selected_date.strftime("%Y-%m-%d")
-
-        # Display tasks for selected date
-        st.subheader(f"Tasks for {selected_date_str}")
+        # Task counts per due date from the stats in session state
+        due_date_counts = st.session_state.task_stats['due_date_counts']
 
-        # Get tasks for the selected date
-        date_tasks = sb.get_tasks_by_date(user_id, selected_date_str)
-
-        if date_tasks:
-            for task in date_tasks:
-                with st.expander(f"{task['description']} ({task['importance']})"):
-                    st.write(f"**Priority Score:** {task['priority_score']:.1f}")
-                    st.write(f"**Status:** {'Completed' if task['completed'] else 'Open'}")
-                    if task['tags']:
-                        st.write(f"**Tags:** {', '.join(['#' + tag for tag in task['tags']])}")
-
-                    # Add quick actions
-                    cols = st.columns(2)
-                    with cols[0]:
-                        if st.button("Mark Complete", key=f"complete_{task['id']}"):
-                            if sb.update_task(task['id'], {'completed': True}, user_id):
-                                st.success("Task marked as complete!")
-                                # Set flag to refresh stats
-                                st.session_state.refresh_stats = True
-                                st.rerun()
-                    with cols[1]:
-                        if st.button("Edit", key=f"cal_edit_{task['id']}"):
-                            st.session_state.editing_task = task
-                            # Switch to Manage Tasks tab
-                            st.query_params['tab'] = "manage"
-                            st.rerun()
-        else:
-            st.info(f"No tasks due on {selected_date_str}. Select another date or add tasks with this due date.")
+        # Date picker and the selected day's tasks
+        _calendar_day_view(user_id)
 
         # Calendar heatmap
         st.subheader("Task Distribution Calendar")
 
         # Create a heatmap of tasks by date
-        if tasks_by_date:
-            import altair as alt
-            import pandas as pd
-            from datetime import datetime, timedelta
-
+        if due_date_counts:
             # Get the current month's date range
             today = datetime.now().date()
             start_of_month = today.replace(day=1)
@@ -909,28 +958,21 @@ else:
             date_range = [start_of_month + timedelta(days=i) for i in range((end_of_month - start_of_month).days + 1)]
             date_strs = [d.strftime("%Y-%m-%d") for d in date_range]
 
-            # Count tasks for each date
-            task_counts = [len(tasks_by_date.get(d, [])) for d in date_strs]
+            # Count tasks for each date from the stats payload
+            task_counts = [due_date_counts.get(d, 0) for d in date_strs]
 
-            # Create DataFrame for heatmap
+            # Create DataFrame for heatmap, deriving the calendar columns from the dates directly
+            days = pd.DatetimeIndex(date_range)
             calendar_data = pd.DataFrame({
                 'date': date_strs,
                 'count': task_counts,
-                'weekday': [datetime.strptime(d, "%Y-%m-%d").strftime("%a") for d in date_strs],
-                'week': [(datetime.strptime(d, "%Y-%m-%d").day - 1) // 7 + 1 for d in date_strs],
-                'day': [datetime.strptime(d, "%Y-%m-%d").day for d in date_strs]
+                'weekday': days.strftime("%a"),
+                'week': (days.day - 1) // 7 + 1,
+                'day': days.day
             })
 
-            # Create heatmap
-            heatmap = alt.Chart(calendar_data).mark_rect().encode(
-                x=alt.X('weekday:O', title='Day of Week', sort=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']),
-                y=alt.Y('week:O', title='Week of Month'),
-                color=alt.Color('count:Q', scale=alt.Scale(scheme='blues'), title='Task Count'),
-                tooltip=['date', 'count']
-            ).properties(width=600, height=300)
-
             # Display heatmap
-            st.altair_chart(heatmap, use_container_width=True)
+            st.vega_lite_chart(calendar_data, dict(HEATMAP_SPEC), use_container_width=True)
 
             # Add note about clicking on dates
             st.info("💡 Tip: Use the date picker above to select a specific date and view tasks due on that date.")
@@ -0,0 +1,42 @@
+import functools
+import re
+from datetime import date, datetime
+from typing import Optional
+
+# Fallback due date formats, each paired with a regex that checks the shape
+# before strptime is tried, so mismatched formats don't raise ValueError
+_DUE_DATE_FORMATS = [
+    (re.compile(r"\d{4}-\d{1,2}-\d{1,2}"), "%Y-%m-%d"),
+    (re.compile(r"\d{1,2}/\d{1,2}/\d{4}"), "%m/%d/%Y"),
+    (re.compile(r"\d{1,2}/\d{1,2}/\d{4}"), "%d/%m/%Y"),
+    (re.compile(r"[A-Za-z]{3} \d{1,2}, \d{4}"), "%b %d, %Y"),
+]
+
+@functools.lru_cache(maxsize=4096)
+def parse_due_date(due_date: str) -> Optional[date]:
+    """
+    Parse a task due date string into a date.
+
+    Args:
+        due_date: Due date string, ideally in ISO format (YYYY-MM-DD)
+
+    Returns:
+        date or None: The parsed date, or None if the string is empty or unrecognized
+    """
+    if not due_date:
+        return None
+
+    # Fast path for ISO dates, which is what the app stores
+    try:
+        return datetime.fromisoformat(due_date).date()
+    except ValueError:
+        pass
+
+    for pattern, fmt in _DUE_DATE_FORMATS:
+        if pattern.fullmatch(due_date):
+            try:
+                return datetime.strptime(due_date, fmt).date()
+            except ValueError:
+                continue
+
+    return None
@@ -1,15 +1,50 @@
 import sqlite3
-import json
+import orjson
 from typing import List, Dict, Optional, Any
 import os
+import atexit
+import threading
 from datetime import datetime
 
 # Database file path
 DB_FILE = "tasks.db"
 
+# One connection per thread, reused across calls instead of reconnecting each time
+_local = threading.local()
+_connections = []
+_connections_lock = threading.Lock()
+
+def _get_conn() -> sqlite3.Connection:
+    """Return this thread's database connection, opening and configuring it on first use."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_FILE, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row  # This enables column access by name
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-20000')
+        _local.conn = conn
+        with _connections_lock:
+            _connections.append(conn)
+    return conn
+
+def _close_connections():
+    """Close every connection opened by this module."""
+    with _connections_lock:
+        for conn in _connections:
+            conn.close()
+        _connections.clear()
+
+atexit.register(_close_connections)
+
+def _now_iso() -> str:
+    """Current timestamp for created_at/updated_at; call once per transaction."""
+    return datetime.now().isoformat(timespec='seconds')
+
 def init_db():
     """Initialize the database with required tables if they don't exist."""
-    conn = sqlite3.connect(DB_FILE)
+    conn = _get_conn()
     cursor = conn.cursor()
     
     # Create tasks table
@@ -27,8 +62,12 @@ def init_db():
     )
     ''')
     
+    # Indexes for priority ordering and due date lookups
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_priority ON tasks(priority_score DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_due_date ON tasks(due_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_completed_due ON tasks(completed, due_date)')
+    
     conn.commit()
-    conn.close()
 
 def save_task(task: Dict[str, Any]) -> int:
     """
@@ -40,33 +79,29 @@ def save_task(task: Dict[str, Any]) -> int:
     Returns:
         int: ID of the inserted task
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    conn = _get_conn()
     
-    now = datetime.now().isoformat()
+    now = _now_iso()
     
     # Convert tags list to JSON string
-    tags_json = json.dumps(task.get('tags', []))
-    
-    cursor.execute('''
-    INSERT INTO tasks (description, due_date, tags, importance, priority_score, completed, created_at, updated_at)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        task.get('description', ''),
-        task.get('due_date', ''),
-        tags_json,
-        task.get('importance', ''),
-        task.get('priority_score', 0.0),
-        task.get('completed', False),
-        now,
-        now
-    ))
-    
-    task_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    
-    return task_id
+    tags_json = orjson.dumps(task.get('tags', [])).decode()
+    
+    with conn:
+        cursor = conn.execute('''
+        INSERT INTO tasks (description, due_date, tags, importance, priority_score, completed, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            task.get('description', ''),
+            task.get('due_date', ''),
+            tags_json,
+            task.get('importance', ''),
+            task.get('priority_score', 0.0),
+            task.get('completed', False),
+            now,
+            now
+        ))
+    
+    return cursor.lastrowid
 
 def save_tasks(tasks: List[Dict[str, Any]]) -> List[int]:
     """
@@ -78,39 +113,97 @@ def save_tasks(tasks: List[Dict[str, Any]]) -> List[int]:
     Returns:
         List[int]: List of inserted task IDs
     """
-    task_ids = []
-    for task in tasks:
-        task_id = save_task(task)
-        task_ids.append(task_id)
-    
-    return task_ids
+    if not tasks:
+        return []
+    
+    now = _now_iso()
+    rows = [
+        (
+            task.get('description', ''),
+            task.get('due_date', ''),
+            orjson.dumps(task.get('tags', [])).decode(),
+            task.get('importance', ''),
+            task.get('priority_score', 0.0),
+            task.get('completed', False),
+            now,
+            now
+        )
+        for task in tasks
+    ]
+    
+    # Insert every row in a single transaction
+    conn = _get_conn()
+    with conn:
+        conn.executemany('''
+        INSERT INTO tasks (description, due_date, tags, importance, priority_score, completed, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        # IDs from one transaction on one connection are contiguous
+        last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    
+    first_id = last_id - len(rows) + 1
+    return list(range(first_id, last_id + 1))
 
-def get_all_tasks() -> List[Dict[str, Any]]:
+def get_all_tasks(
+    eager_tags: bool = True,
+    due_date: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+) -> List[Dict[str, Any]]:
     """
-    Retrieve all tasks from the database.
+    Retrieve tasks from the database, highest priority first.
+    
+    Args:
+        eager_tags: If False, leave each task's tags as the raw JSON string under
+            'tags_raw' so they are only decoded by get_task_tags when needed
+        due_date: Only return tasks due on this date (YYYY-MM-DD)
+        limit: Maximum number of tasks to return
+        offset: Number of tasks to skip, used with limit for paging
     
     Returns:
         List[Dict]: List of task dictionaries
     """
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row  # This enables column access by name
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT * FROM tasks ORDER BY priority_score DESC')
+    query = 'SELECT * FROM tasks'
+    params = []
+    if due_date is not None:
+        query += ' WHERE due_date = ?'
+        params.append(due_date)
+    query += ' ORDER BY priority_score DESC'
+    if limit is not None:
+        query += ' LIMIT ? OFFSET ?'
+        params.extend([limit, offset])
+    
+    cursor = _get_conn().execute(query, params)
     rows = cursor.fetchall()
     
     tasks = []
     for row in rows:
         task = dict(row)
-        # Convert JSON string back to list
-        task['tags'] = json.loads(task['tags'])
+        if eager_tags:
+            # Convert JSON string back to list
+            task['tags'] = orjson.loads(task['tags'])
+        else:
+            task['tags_raw'] = task.pop('tags')
         # Convert SQLite integer to boolean
         task['completed'] = bool(task['completed'])
         tasks.append(task)
     
-    conn.close()
     return tasks
 
+def get_task_tags(task: Dict[str, Any]) -> List[str]:
+    """
+    Get a task's tags, decoding them on first access for lazily loaded tasks.
+    
+    Args:
+        task: Task dictionary from get_all_tasks
+        
+    Returns:
+        List[str]: The task's tags
+    """
+    if 'tags' not in task:
+        task['tags'] = orjson.loads(task.pop('tags_raw', None) or '[]')
+    return task['tags']
+
 def get_task(task_id: int) -> Optional[Dict[str, Any]]:
     """
     Retrieve a specific task by ID.
@@ -121,23 +214,29 @@ def get_task(task_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Dict or None: Task dictionary if found, None otherwise
     """
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
+    cursor = _get_conn().execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
     row = cursor.fetchone()
     
     if row:
         task = dict(row)
-        task['tags'] = json.loads(task['tags'])
+        task['tags'] = orjson.loads(task['tags'])
         task['completed'] = bool(task['completed'])
-        conn.close()
         return task
     
-    conn.close()
     return None
 
+_UPDATE_TASK_SQL = '''
+UPDATE tasks SET
+    description = COALESCE(?, description),
+    due_date = COALESCE(?, due_date),
+    tags = COALESCE(?, tags),
+    importance = COALESCE(?, importance),
+    priority_score = COALESCE(?, priority_score),
+    completed = COALESCE(?, completed),
+    updated_at = ?
+WHERE id = ?
+'''
+
 def update_task(task_id: int, task_data: Dict[str, Any]) -> bool:
     """
     Update a task in the database.
@@ -149,43 +248,25 @@ def update_task(task_id: int, task_data: Dict[str, Any]) -> bool:
     Returns:
         bool: True if update was successful, False otherwise
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    # Check if task exists
-    cursor.execute('SELECT id FROM tasks WHERE id = ?', (task_id,))
-    if not cursor.fetchone():
-        conn.close()
-        return False
-    
-    # Prepare update data
-    update_fields = []
-    params = []
-    
-    for key, value in task_data.items():
-        if key == 'tags' and isinstance(value, list):
-            update_fields.append(f"{key} = ?")
-            params.append(json.dumps(value))
-        elif key in ['description', 'due_date', 'importance', 'priority_score', 'completed']:
-            update_fields.append(f"{key} = ?")
-            params.append(value)
-    
-    # Add updated_at timestamp
-    update_fields.append("updated_at = ?")
-    params.append(datetime.now().isoformat())
-    
-    # Add task_id to params
-    params.append(task_id)
-    
-    # Execute update
-    query = f"UPDATE tasks SET {', '.join(update_fields)} WHERE id = ?"
-    cursor.execute(query, params)
-    
-    success = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
-    
-    return success
+    tags = task_data.get('tags')
+    tags_json = orjson.dumps(tags).decode() if isinstance(tags, list) else None
+    
+    # Fixed statement text so the connection's statement cache reuses one prepared plan;
+    # columns missing from task_data are bound as NULL and keep their current value
+    conn = _get_conn()
+    with conn:
+        cursor = conn.execute(_UPDATE_TASK_SQL, (
+            task_data.get('description'),
+            task_data.get('due_date'),
+            tags_json,
+            task_data.get('importance'),
+            task_data.get('priority_score'),
+            task_data.get('completed'),
+            _now_iso(),
+            task_id
+        ))
+    
+    return cursor.rowcount > 0
 
 def delete_task(task_id: int) -> bool:
     """
@@ -197,16 +278,11 @@ def delete_task(task_id: int) -> bool:
     Returns:
         bool: True if deletion was successful, False otherwise
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+    conn = _get_conn()
+    with conn:
+        cursor = conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
     
-    success = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
-    
-    return success
+    return cursor.rowcount > 0
 
 def toggle_task_completion(task_id: int) -> bool:
     """
@@ -218,31 +294,16 @@ def toggle_task_completion(task_id: int) -> bool:
     Returns:
         bool: True if toggle was successful, False otherwise
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    # Get current completion status
-    cursor.execute('SELECT completed FROM tasks WHERE id = ?', (task_id,))
-    row = cursor.fetchone()
+    conn = _get_conn()
     
-    if not row:
-        conn.close()
-        return False
-    
-    # Toggle status
-    new_status = not bool(row[0])
-    
-    # Update task
-    cursor.execute(
-        'UPDATE tasks SET completed = ?, updated_at = ? WHERE id = ?',
-        (new_status, datetime.now().isoformat(), task_id)
-    )
+    # Flip the status in place; RETURNING yields no row when the task doesn't exist
+    with conn:
+        row = conn.execute(
+            'UPDATE tasks SET completed = NOT completed, updated_at = ? WHERE id = ? RETURNING completed',
+            (_now_iso(), task_id)
+        ).fetchone()
     
-    success = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
-    
-    return success
+    return row is not None
 
 def clear_all_tasks() -> int:
     """
@@ -251,16 +312,11 @@ def clear_all_tasks() -> int:
     Returns:
         int: Number of tasks deleted
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM tasks')
-    
-    deleted_count = cursor.rowcount
-    conn.commit()
-    conn.close()
+    conn = _get_conn()
+    with conn:
+        cursor = conn.execute('DELETE FROM tasks')
     
-    return deleted_count
+    return cursor.rowcount
 
 # Initialize the database when the module is imported
-init_db()
+init_db()
\ No newline at end of file
@@ -1,8 +1,30 @@
+import functools
+import importlib.util
+from langchain_core.runnables.graph import MermaidDrawMethod
 from langchain_core.runnables.graph_mermaid import draw_mermaid, draw_mermaid_png
 
+# Render locally with headless Chromium when pyppeteer is installed, avoiding the
+# Mermaid.ink round-trip; otherwise fall back to the Mermaid.ink API
+DRAW_METHOD = (
+    MermaidDrawMethod.PYPPETEER
+    if importlib.util.find_spec("pyppeteer") is not None
+    else MermaidDrawMethod.API
+)
+
+@functools.lru_cache(maxsize=16)
+def _render_png(mermaid_syntax, background_color, padding):
+    """Render Mermaid syntax to PNG bytes, cached so an unchanged graph is only rendered once."""
+    return draw_mermaid_png(
+        mermaid_syntax=mermaid_syntax,
+        draw_method=DRAW_METHOD,
+        background_color=background_color,
+        padding=padding
+    )
+
 def visualize_graph(graph, output_file=None):
     """
-    Visualize the graph using Mermaid.ink API
+    Visualize the graph as a PNG, rendered locally via pyppeteer when available,
+    otherwise through the Mermaid.ink API
     Args:
         graph: Your LangGraph graph
         output_file: Optional path to save the PNG
@@ -21,13 +43,12 @@ def visualize_graph(graph, output_file=None):
         # Fall back to using the graph directly with draw_mermaid function
         mermaid_syntax = draw_mermaid(graph)
 
-    # Convert to PNG using Mermaid.ink API
-    img_bytes = draw_mermaid_png(
-        mermaid_syntax=mermaid_syntax,
-        output_file_path=output_file,
-        draw_method="API",  # Use Mermaid.ink API
-        background_color="white",
-        padding=10
-    )
+    # Convert to PNG (cached per Mermaid syntax)
+    img_bytes = _render_png(mermaid_syntax, "white", 10)
+
+    if output_file:
+        with open(output_file, "wb") as f:
+            f.write(img_bytes)
+        return output_file
 
-    return output_file if output_file else img_bytes
\ No newline at end of file
+    return img_bytes
\ No newline at end of file
@@ -2,6 +2,7 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from langserve import add_routes
 from pydantic import BaseModel, Field
 from task_prioritizer import build_task_prioritizer_graph
@@ -19,7 +20,8 @@ API_KEY = os.getenv("LANGSERVE_API_KEY", "dev-api-key-change-me")
 app = FastAPI(
     title="Task Prioritizer API",
     version="1.0",
-    description="API for prioritizing tasks using LLMs"
+    description="API for prioritizing tasks using LLMs",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware to allow requests from the Streamlit app
@@ -77,7 +79,8 @@ async def prioritize_tasks(input_data: TaskPrioritizerInput):
 
     # Run the task prioritizer
     try:
-        result = task_prioritizer.invoke(full_input)
+        # Graph nodes are async, so concurrent requests share the event loop
+        result = await task_prioritizer.ainvoke(full_input)
 
         # Extract the output
         output = result.get("output", "No output generated.")
@@ -123,4 +126,15 @@ if __name__ == "__main__":
     import uvicorn
     # Get port from environment or use default
     port = int(os.getenv("LANGSERVE_PORT", "8000"))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Each worker process builds its own graph at import
+    workers = int(os.getenv("LANGSERVE_WORKERS", str(min(4, os.cpu_count() or 1))))
+    # "auto" picks uvloop and httptools when installed, falling back to asyncio/h11
+    uvicorn.run(
+        "langserve_api:app",
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        log_level="warning"
+    )
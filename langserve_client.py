@@ -1,4 +1,7 @@
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 from typing import Dict, Any, Tuple, Optional
 from dotenv import load_dotenv
@@ -10,6 +13,20 @@ load_dotenv()
 LANGSERVE_API_URL = os.getenv("LANGSERVE_API_URL", "http://localhost:8000")
 LANGSERVE_API_KEY = os.getenv("LANGSERVE_API_KEY", "dev-api-key-change-me")
 
+# Timeouts in seconds; prioritizing runs several LLM calls so it gets a generous limit
+PRIORITIZE_TIMEOUT = 120
+HEALTH_TIMEOUT = 2
+
+# Shared session so repeated calls reuse pooled keep-alive connections
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=2, backoff_factor=0.2))
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+_session.headers.update({
+    "Content-Type": "application/json",
+    "X-API-Key": LANGSERVE_API_KEY
+})
+
 def call_task_prioritizer_api(user_input: str) -> Tuple[str, Optional[Dict[str, Any]]]:
     """
     Call the LangServe API to prioritize tasks.
@@ -24,12 +41,6 @@ def call_task_prioritizer_api(user_input: str) -> Tuple[str, Optional[Dict[str,
     """
     api_url = f"{LANGSERVE_API_URL}/api/prioritize"
     
-    # Prepare the headers with API key
-    headers = {
-        "Content-Type": "application/json",
-        "X-API-Key": LANGSERVE_API_KEY
-    }
-    
     # Prepare the input for the API
     payload = {
         "input": {
@@ -44,11 +55,11 @@ def call_task_prioritizer_api(user_input: str) -> Tuple[str, Optional[Dict[str,
     
     try:
         # Call the API
-        response = requests.post(api_url, json=payload, headers=headers)
+        response = _session.post(api_url, data=orjson.dumps(payload), timeout=PRIORITIZE_TIMEOUT)
         response.raise_for_status()  # Raise exception for HTTP errors
         
         # Parse the response
-        result = response.json()
+        result = orjson.loads(response.content)
         
         # Extract the output
         if "output" in result:
@@ -56,7 +67,7 @@ def call_task_prioritizer_api(user_input: str) -> Tuple[str, Optional[Dict[str,
             return output, None
         else:
             return "Error: Unexpected API response format", None
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         return f"Error calling task prioritizer API: {str(e)}", None
 
 def check_api_health() -> bool:
@@ -67,7 +78,7 @@ def check_api_health() -> bool:
         bool: True if the API is healthy, False otherwise
     """
     try:
-        response = requests.get(f"{LANGSERVE_API_URL}/health")
+        response = _session.get(f"{LANGSERVE_API_URL}/health", timeout=HEALTH_TIMEOUT)
         return response.status_code == 200
     except:
         return False
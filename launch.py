@@ -1,16 +1,14 @@
 #!/usr/bin/env python3
 import os
 import subprocess
-import socket
-import time
 import signal
 import sys
-import platform
-import threading
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from launch_common import IS_LINUX, IS_WINDOWS, check_and_clear_port, load_env, wait_for_port
 
-# Load environment variables
-load_dotenv()
+# Load environment variables (a small parser, so launching doesn't import python-dotenv)
+load_env()
 
 # Configuration
 STREAMLIT_PORT = 8501
@@ -19,115 +17,31 @@ APP_FILE = "app.py"
 LANGSERVE_FILE = "langserve_api.py"
 AUTO_KILL = True  # Automatically kill processes without asking
 
-def is_port_in_use(port):
-    """Check if a port is in use."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) == 0
-
-def find_process_on_port(port):
-    """Find the process ID using the specified port."""
-    system = platform.system()
-    
-    try:
-        if system == "Darwin" or system == "Linux":  # macOS or Linux
-            cmd = f"lsof -i :{port} -t"
-            output = subprocess.check_output(cmd, shell=True).decode().strip()
-            if output:
-                return [int(pid) for pid in output.split('\n')]
-        elif system == "Windows":
-            cmd = f"netstat -ano | findstr :{port}"
-            output = subprocess.check_output(cmd, shell=True).decode()
-            if output:
-                lines = output.strip().split('\n')
-                pids = set()
-                for line in lines:
-                    if f":{port}" in line:
-                        parts = line.strip().split()
-                        if len(parts) >= 5:
-                            pids.add(int(parts[-1]))
-                return list(pids)
-    except subprocess.CalledProcessError:
-        pass
-    
-    return []
-
-def kill_process(pid):
-    """Kill a process by its PID."""
-    try:
-        if platform.system() == "Windows":
-            subprocess.run(["taskkill", "/F", "/PID", str(pid)], check=True)
-        else:  # macOS or Linux
-            os.kill(pid, signal.SIGTERM)
-            # Give it a moment to terminate gracefully
-            time.sleep(0.5)
-            # If still running, force kill
-            if is_process_running(pid):
-                os.kill(pid, signal.SIGKILL)
-        print(f"Process with PID {pid} has been terminated.")
-        return True
-    except (subprocess.CalledProcessError, OSError, ProcessLookupError) as e:
-        print(f"Failed to kill process {pid}: {e}")
-        return False
-
-def is_process_running(pid):
-    """Check if a process is still running."""
-    try:
-        if platform.system() == "Windows":
-            subprocess.check_output(["tasklist", "/FI", f"PID eq {pid}"])
-            return True
-        else:  # macOS or Linux
-            os.kill(pid, 0)  # Signal 0 doesn't kill the process but checks if it exists
-            return True
-    except (subprocess.CalledProcessError, OSError, ProcessLookupError):
-        return False
-
-def check_and_clear_port(port):
-    """Check if a port is in use and clear it if necessary."""
-    if is_port_in_use(port):
-        print(f"Port {port} is already in use.")
-        pids = find_process_on_port(port)
-        
-        if pids:
-            print(f"Found process(es) using port {port}: {pids}")
-            
-            if AUTO_KILL:
-                print(f"Automatically terminating processes using port {port}...")
-                for pid in pids:
-                    kill_process(pid)
-                # Wait a moment for the port to be released
-                time.sleep(1)
-                if is_port_in_use(port):
-                    print(f"Port {port} is still in use. Please check manually.")
-                    return False
-                print(f"Port {port} is now available.")
-                return True
-            else:
-                print("Exiting because port is in use and AUTO_KILL is disabled.")
-                return False
-        else:
-            print(f"Could not identify the process using port {port}.")
-            if not AUTO_KILL:
-                return False
-            print("Attempting to run anyway...")
-            return True
-    return True
+def _die_with_parent():
+    """Ask the kernel to SIGTERM this child when its parent process exits (Linux only)."""
+    import ctypes
+    PR_SET_PDEATHSIG = 1
+    ctypes.CDLL("libc.so.6", use_errno=True).prctl(PR_SET_PDEATHSIG, signal.SIGTERM)
 
 def run_langserve():
-    """Run the LangServe API server."""
+    """Start the LangServe API server in the background and return its process."""
     print(f"Starting LangServe API server on port {LANGSERVE_PORT}...")
-    try:
-        subprocess.run(["python", LANGSERVE_FILE], check=True)
-    except KeyboardInterrupt:
-        print("\nLangServe API server was interrupted by user.")
-    except subprocess.CalledProcessError as e:
-        print(f"\nLangServe API server failed with error code {e.returncode}")
+    # On Linux the server is tied to the launcher process, which becomes Streamlit after exec
+    preexec_fn = _die_with_parent if IS_LINUX else None
+    return subprocess.Popen(["python", LANGSERVE_FILE], preexec_fn=preexec_fn)
 
 def run_streamlit():
     """Run the Streamlit app."""
     print(f"Starting Streamlit on port {STREAMLIT_PORT}...")
+    # Set environment variables
+    os.environ["STREAMLIT_SERVER_PORT"] = str(STREAMLIT_PORT)
+    if not IS_WINDOWS:
+        # Replace the launcher with Streamlit rather than keeping an idle parent around;
+        # exec discards unflushed stdio buffers, so flush the launcher's output first
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execvp("streamlit", ["streamlit", "run", APP_FILE])
     try:
-        # Set environment variables
-        os.environ["STREAMLIT_SERVER_PORT"] = str(STREAMLIT_PORT)
         subprocess.run(["streamlit", "run", APP_FILE], check=True)
     except KeyboardInterrupt:
         print("\nStreamlit process was interrupted by user.")
@@ -138,27 +52,29 @@ def main():
     """Main function to launch both the LangServe API server and the Streamlit app."""
     print("Starting Personal Task Prioritizer with LangServe integration...")
     
-    # Check and clear ports
-    if not check_and_clear_port(LANGSERVE_PORT):
-        sys.exit(1)
-    if not check_and_clear_port(STREAMLIT_PORT):
+    # Check and clear both ports concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(partial(check_and_clear_port, auto_kill=AUTO_KILL), [LANGSERVE_PORT, STREAMLIT_PORT]))
+    if not all(results):
         sys.exit(1)
     
-    # Start LangServe API server in a separate thread
-    langserve_thread = threading.Thread(target=run_langserve)
-    langserve_thread.daemon = True  # This ensures the thread will exit when the main program exits
-    langserve_thread.start()
+    # Start LangServe API server as a background process
+    langserve_process = run_langserve()
     
-    # Wait a moment for LangServe to start
+    # Wait for LangServe to start accepting connections
     print("Waiting for LangServe API server to start...")
-    time.sleep(2)
+    if not wait_for_port(LANGSERVE_PORT, 15):
+        print("LangServe API server failed to bind to its port.")
+        langserve_process.terminate()
+        sys.exit(1)
     
-    # Start Streamlit app in the main thread
+    # Start Streamlit; outside Windows this execs and never returns
     run_streamlit()
     
     # If we get here, Streamlit has exited, so we should exit too
     print("Exiting...")
+    langserve_process.terminate()
     sys.exit(0)
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
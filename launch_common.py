@@ -0,0 +1,192 @@
+"""Port and process helpers shared by the launcher scripts."""
+import os
+import subprocess
+import socket
+import time
+import signal
+import platform
+
+# The OS doesn't change at runtime, so look it up once
+SYSTEM = platform.system()
+IS_WINDOWS = SYSTEM == "Windows"
+IS_LINUX = SYSTEM == "Linux"
+
+if IS_WINDOWS:
+    import ctypes
+    from ctypes import wintypes
+
+    # Query and terminate processes through kernel32 instead of forking tasklist/taskkill
+    _k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _k32.OpenProcess.restype = wintypes.HANDLE
+    _k32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    _k32.GetExitCodeProcess.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+    _k32.TerminateProcess.argtypes = (wintypes.HANDLE, wintypes.UINT)
+    _k32.CloseHandle.argtypes = (wintypes.HANDLE,)
+    PROCESS_TERMINATE = 0x0001
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    STILL_ACTIVE = 259
+
+def load_env(path=".env"):
+    """Load KEY=VALUE lines from a .env file into os.environ without overriding existing variables."""
+    try:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    os.environ.setdefault(key.strip(), value.strip().strip('"').strip("'"))
+    except FileNotFoundError:
+        pass
+
+def is_port_in_use(port):
+    """Check if a port is in use."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        return s.connect_ex(('localhost', port)) == 0
+
+def _listening_inodes(port):
+    """Collect the socket inodes listening on a port from /proc/net/tcp and tcp6."""
+    port_hex = f":{port:04X}"
+    inodes = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f)  # Skip the header row
+                for line in f:
+                    fields = line.split()
+                    # fields: sl, local_address, rem_address, st, ..., inode; state 0A is LISTEN
+                    if fields[1].endswith(port_hex) and fields[3] == "0A":
+                        inodes.add(f"socket:[{fields[9]}]")
+        except FileNotFoundError:
+            continue
+    return inodes
+
+def _pids_for_inodes(inodes):
+    """Find the processes holding any of the given socket inodes open."""
+    pids = []
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            for fd in os.scandir(f"/proc/{entry.name}/fd"):
+                if os.readlink(fd.path) in inodes:
+                    pids.append(int(entry.name))
+                    break
+        except OSError:
+            # Process exited or belongs to another user
+            continue
+    return pids
+
+def wait_for_port(port, timeout=10.0):
+    """Wait until something is listening on a port, returning False on timeout."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_port_in_use(port):
+            return True
+        time.sleep(0.05)
+    return False
+
+def find_pids_on_port(port):
+    """Find the process ID using the specified port."""
+    try:
+        if IS_LINUX:
+            # Read the kernel socket tables directly instead of forking lsof
+            inodes = _listening_inodes(port)
+            return _pids_for_inodes(inodes) if inodes else []
+        elif SYSTEM == "Darwin":  # macOS
+            output = subprocess.run(["lsof", "-i", f":{port}", "-t"], capture_output=True, text=True).stdout.strip()
+            if output:
+                return [int(pid) for pid in output.split('\n')]
+        elif IS_WINDOWS:
+            # Filter netstat output here rather than piping through cmd.exe and findstr
+            output = subprocess.run(["netstat", "-ano"], capture_output=True, text=True).stdout
+            pids = set()
+            for line in output.splitlines():
+                parts = line.split()
+                if len(parts) >= 5 and parts[1].endswith(f":{port}"):
+                    pids.add(int(parts[-1]))
+            return list(pids)
+    except (subprocess.CalledProcessError, OSError, ValueError):
+        pass
+    
+    return []
+
+def kill_process(pid):
+    """Kill a process by its PID."""
+    try:
+        if IS_WINDOWS:
+            handle = _k32.OpenProcess(PROCESS_TERMINATE, False, pid)
+            if not handle:
+                raise ctypes.WinError(ctypes.get_last_error())
+            try:
+                if not _k32.TerminateProcess(handle, 1):
+                    raise ctypes.WinError(ctypes.get_last_error())
+            finally:
+                _k32.CloseHandle(handle)
+        else:  # macOS or Linux
+            os.kill(pid, signal.SIGTERM)
+            # Give it up to half a second to terminate gracefully
+            for _ in range(25):
+                if not is_process_running(pid):
+                    break
+                time.sleep(0.02)
+            # If still running, force kill
+            if is_process_running(pid):
+                os.kill(pid, signal.SIGKILL)
+        print(f"Process with PID {pid} has been terminated.")
+        return True
+    except (OSError, ProcessLookupError) as e:
+        print(f"Failed to kill process {pid}: {e}")
+        return False
+
+def is_process_running(pid):
+    """Check if a process is still running."""
+    try:
+        if IS_WINDOWS:
+            handle = _k32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+            if not handle:
+                return False
+            try:
+                code = wintypes.DWORD()
+                _k32.GetExitCodeProcess(handle, ctypes.byref(code))
+                return code.value == STILL_ACTIVE
+            finally:
+                _k32.CloseHandle(handle)
+        else:  # macOS or Linux
+            os.kill(pid, 0)  # Signal 0 doesn't kill the process but checks if it exists
+            return True
+    except (OSError, ProcessLookupError):
+        return False
+
+def check_and_clear_port(port, auto_kill=True):
+    """Check if a port is in use and clear it if necessary, killing its owners when auto_kill is set."""
+    if is_port_in_use(port):
+        print(f"Port {port} is already in use.")
+        pids = find_pids_on_port(port)
+        
+        if pids:
+            print(f"Found process(es) using port {port}: {pids}")
+            
+            if auto_kill:
+                print(f"Automatically terminating processes using port {port}...")
+                for pid in pids:
+                    kill_process(pid)
+                # Wait up to a second for the port to be released
+                for _ in range(20):
+                    if not is_port_in_use(port):
+                        break
+                    time.sleep(0.05)
+                else:
+                    print(f"Port {port} is still in use. Please check manually.")
+                    return False
+                print(f"Port {port} is now available.")
+                return True
+            else:
+                print("Exiting because port is in use and auto-kill is disabled.")
+                return False
+        else:
+            print(f"Could not identify the process using port {port}.")
+            if not auto_kill:
+                return False
+            print("Attempting to run anyway...")
+            return True
+    return True
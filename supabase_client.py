@@ -1,18 +1,69 @@
 
-from supabase import create_client
+from supabase import Client
+from postgrest import SyncPostgrestClient
+from postgrest.types import ReturnMethod
+from postgrest.utils import SyncClient
+import asyncio
+import functools
+import httpx
+import ijson
 import os
 from dotenv import load_dotenv
-import json
+import logging
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
 # Load environment variables
 load_dotenv()
 
+# Debug output is off unless the application enables DEBUG logging for this module
+logger = logging.getLogger(__name__)
+
+class _SharedTransport(httpx.HTTPTransport):
+    """HTTP transport shared for the life of the process; closing a client that uses it leaves it open."""
+
+    def __exit__(self, exc_type=None, exc_value=None, traceback=None):
+        pass
+
+    def close(self):
+        pass
+
+# Shared HTTP/2 connection pools for PostgREST requests, one per (verify, proxy) setting.
+# The Supabase client rebuilds its PostgREST client on every auth event, so the pools live
+# here to survive those resets. They are shared process-wide and must never be closed.
+@functools.lru_cache(maxsize=None)
+def _postgrest_transport(verify, proxy):
+    return _SharedTransport(
+        http2=True,
+        verify=verify,
+        proxy=proxy,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
+
+class _PooledPostgrestClient(SyncPostgrestClient):
+    """PostgREST client whose sessions all use a shared connection pool."""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return SyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            follow_redirects=True,
+            transport=_postgrest_transport(verify, proxy)
+        )
+
+class _PooledClient(Client):
+    """Supabase client that builds its PostgREST client on the shared connection pool."""
+
+    @staticmethod
+    def _init_postgrest_client(rest_url, headers, schema, timeout, verify=True, proxy=None):
+        return _PooledPostgrestClient(rest_url, headers=headers, schema=schema, timeout=timeout, verify=verify, proxy=proxy)
+
 # Initialize Supabase client
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_KEY")
-supabase = create_client(supabase_url, supabase_key)
+supabase = _PooledClient.create(supabase_url, supabase_key)
 
 # Redirect URL for OAuth
 REDIRECT_URL = os.getenv("REDIRECT_URL", "http://localhost:8501")
@@ -26,7 +77,7 @@ def sign_up(email: str, password: str) -> Dict[str, Any]:
         })
         return response
     except Exception as e:
-        print(f"Error signing up: {str(e)}")
+        logger.error("Error signing up: %s", e)
         raise e
 
 def sign_in(email: str, password: str) -> Dict[str, Any]:
@@ -39,10 +90,10 @@ def sign_in(email: str, password: str) -> Dict[str, Any]:
         })
 
         # Print debug info
-        print(f"Sign in successful for {email}")
-        print(f"Response type: {type(response)}")
-        print(f"User: {response.user is not None}")
-        print(f"Session: {response.session is not None}")
+        logger.debug("Sign in successful for %s", email)
+        logger.debug("Response type: %s", type(response))
+        logger.debug("User: %s", response.user is not None)
+        logger.debug("Session: %s", response.session is not None)
 
         # Verify we have a session
         if response.session is None:
@@ -50,18 +101,20 @@ def sign_in(email: str, password: str) -> Dict[str, Any]:
 
         # Set the session in the client
         supabase.auth.set_session(response.session.access_token, response.session.refresh_token)
+        _get_user_for_token.cache_clear()
 
         return response
     except Exception as e:
-        print(f"Error signing in: {str(e)}")
+        logger.error("Error signing in: %s", e)
         raise e
 
 def sign_out() -> None:
     """Sign out the current user."""
     try:
         supabase.auth.sign_out()
+        _get_user_for_token.cache_clear()
     except Exception as e:
-        print(f"Error signing out: {str(e)}")
+        logger.error("Error signing out: %s", e)
         raise e
 
 def reset_password(email: str) -> Dict[str, Any]:
@@ -77,10 +130,10 @@ def reset_password(email: str) -> Dict[str, Any]:
         response = supabase.auth.reset_password_email(email, {
             "redirect_to": f"{REDIRECT_URL}/reset-password"
         })
-        print(f"Password reset email sent to {email}")
+        logger.debug("Password reset email sent to %s", email)
         return response
     except Exception as e:
-        print(f"Error sending password reset email: {str(e)}")
+        logger.error("Error sending password reset email: %s", e)
         raise e
 
 def update_password(new_password: str) -> Dict[str, Any]:
@@ -94,16 +147,25 @@ def update_password(new_password: str) -> Dict[str, Any]:
     """
     try:
         response = supabase.auth.update_user({"password": new_password})
-        print("Password updated successfully")
+        _get_user_for_token.cache_clear()
+        logger.debug("Password updated successfully")
         return response
     except Exception as e:
-        print(f"Error updating password: {str(e)}")
+        logger.error("Error updating password: %s", e)
         raise e
 
+@functools.lru_cache(maxsize=128)
+def _get_user_for_token(access_token: str) -> Optional[Dict[str, Any]]:
+    """Fetch the user for an access token; cached so each token costs one auth request."""
+    return supabase.auth.get_user(access_token)
+
 def get_current_user() -> Optional[Dict[str, Any]]:
     """Get the current logged-in user."""
     try:
-        return supabase.auth.get_user()
+        session = supabase.auth.get_session()
+        if session is None:
+            return None
+        return _get_user_for_token(session.access_token)
     except Exception:
         return None
 
@@ -116,10 +178,10 @@ def sign_in_with_google() -> Dict[str, Any]:
                 "redirect_to": REDIRECT_URL
             }
         })
-        print(f"Generated Google auth URL: {auth_url}")
+        logger.debug("Generated Google auth URL: %s", auth_url)
         return auth_url
     except Exception as e:
-        print(f"Error generating Google auth URL: {str(e)}")
+        logger.error("Error generating Google auth URL: %s", e)
         raise e
 
 def handle_auth_callback(url_params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -131,6 +193,7 @@ def handle_auth_callback(url_params: Dict[str, Any]) -> Optional[Dict[str, Any]]
     Returns:
         Dict or None: User data if successful, None otherwise
     """
+    _get_user_for_token.cache_clear()
     try:
         # Check if we have the necessary parameters
         if 'access_token' in url_params and 'refresh_token' in url_params:
@@ -145,12 +208,45 @@ def handle_auth_callback(url_params: Dict[str, Any]) -> Optional[Dict[str, Any]]
                 supabase.auth.set_session(auth_response.session.access_token, auth_response.session.refresh_token)
             return supabase.auth.get_user()
         else:
-            print("Missing required parameters in callback URL")
+            logger.warning("Missing required parameters in callback URL")
             return None
     except Exception as e:
-        print(f"Error handling auth callback: {str(e)}")
+        logger.error("Error handling auth callback: %s", e)
         return None
 
+# Maximum rows per insert request, to stay under PostgREST's request size limit
+SAVE_CHUNK_SIZE = 500
+
+def _prepare_task(task: Dict[str, Any], user_id: str, now: str) -> Dict[str, Any]:
+    """
+    Build the row to insert for a task.
+
+    Args:
+        task: Dictionary containing task details
+        user_id: ID of the user who owns the task
+        now: Timestamp to use for created_at and updated_at
+
+    Returns:
+        Dict: Copy of the task with user_id and timestamps
+    """
+    if not isinstance(task.get('tags'), list):
+        raise ValueError("Task must contain a 'tags' field that is a list")
+
+    task_copy = task.copy()
+    task_copy['user_id'] = user_id
+    task_copy['created_at'] = now
+    task_copy['updated_at'] = now
+    return task_copy
+
+def _raise_save_error(e: Exception) -> None:
+    """Re-raise a save error, reporting a missing session as the likely cause."""
+    # Try to get the current session
+    session = supabase.auth.get_session()
+    logger.debug("Current session: %s", session is not None)
+    if session is None:
+        raise ValueError("No active session. Please log in again.")
+    raise e
+
 def save_task(task: Dict[str, Any], user_id: str) -> Dict[str, Any]:
     """
     Save a task to Supabase.
@@ -162,44 +258,27 @@ def save_task(task: Dict[str, Any], user_id: str) -> Dict[str, Any]:
     Returns:
         Dict: The saved task with its ID
     """
-    # Convert tags list to JSON string
-    if 'tags' in task and isinstance(task['tags'], list):
-        task_copy = task.copy()
-        task_copy['tags'] = json.dumps(task_copy['tags'])
-        task_copy['user_id'] = user_id
+    task_copy = _prepare_task(task, user_id, datetime.now().isoformat())
 
-        # Add timestamps
-        from datetime import datetime
-        now = datetime.now().isoformat()
-        task_copy['created_at'] = now
-        task_copy['updated_at'] = now
+    # Print debug info
+    logger.debug("Saving task with user_id: %s", user_id)
+    logger.debug("Task data: %s", task_copy)
 
-        # Print debug info
-        print(f"Saving task with user_id: {user_id}")
-        print(f"Task data: {task_copy}")
+    try:
+        # Insert into Supabase
+        response = supabase.table('tasks').insert(task_copy).execute()
 
-        try:
-            # Insert into Supabase
-            response = supabase.table('tasks').insert(task_copy).execute()
-
-            # Return the first inserted record
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-            return {}
-        except Exception as e:
-            print(f"Error saving task: {str(e)}")
-            # Try to get the current session
-            session = supabase.auth.get_session()
-            print(f"Current session: {session is not None}")
-            if session is None:
-                raise ValueError("No active session. Please log in again.")
-            raise e
-    else:
-        raise ValueError("Task must contain a 'tags' field that is a list")
+        # Return the first inserted record
+        if response.data and len(response.data) > 0:
+            return response.data[0]
+        return {}
+    except Exception as e:
+        logger.error("Error saving task: %s", e)
+        _raise_save_error(e)
 
 def save_tasks(tasks: List[Dict[str, Any]], user_id: str) -> List[Dict[str, Any]]:
     """
-    Save multiple tasks to Supabase.
+    Save multiple tasks to Supabase with one multi-row insert per chunk.
 
     Args:
         tasks: List of task dictionaries
@@ -208,33 +287,88 @@ def save_tasks(tasks: List[Dict[str, Any]], user_id: str) -> List[Dict[str, Any]
     Returns:
         List[Dict]: The saved tasks with their IDs
     """
+    now = datetime.now().isoformat()
+    payload = [_prepare_task(task, user_id, now) for task in tasks]
+
     saved_tasks = []
-    for task in tasks:
-        saved_task = save_task(task, user_id)
-        saved_tasks.append(saved_task)
+    try:
+        for start in range(0, len(payload), SAVE_CHUNK_SIZE):
+            response = supabase.table('tasks').insert(payload[start:start + SAVE_CHUNK_SIZE]).execute()
+            saved_tasks.extend(response.data or [])
+    except Exception as e:
+        logger.error("Error saving tasks: %s", e)
+        _raise_save_error(e)
 
     return saved_tasks
 
-def get_all_tasks(user_id: str) -> List[Dict[str, Any]]:
+# Columns the task list views need, so they don't pull whole rows
+TASK_LIST_COLUMNS = 'id,description,due_date,tags,importance,priority_score,completed'
+
+def get_all_tasks(user_id: str, columns: str = '*', limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
     """
-    Retrieve all tasks for a user from Supabase.
+    Retrieve a user's tasks from Supabase, highest priority first.
 
     Args:
         user_id: ID of the user whose tasks to retrieve
+        columns: Comma-separated columns to select
+        limit: Maximum number of tasks to return, or None for all of them
+        offset: Number of tasks to skip, used with limit for paging
 
     Returns:
         List[Dict]: List of task dictionaries
     """
-    response = supabase.table('tasks').select('*').eq('user_id', user_id).order('priority_score', desc=True).execute()
+    # Ordered by the (user_id, priority_score DESC) index, so pages are read pre-sorted
+    query = supabase.table('tasks').select(columns).eq('user_id', user_id).order('priority_score', desc=True)
+    if limit is not None:
+        query = query.range(offset, offset + limit - 1)
+    response = query.execute()
 
-    tasks = []
-    for task in response.data:
-        # Convert JSON string back to list for tags
-        if 'tags' in task and isinstance(task['tags'], str):
-            task['tags'] = json.loads(task['tags'])
-        tasks.append(task)
+    # tags is a jsonb column, so it already arrives as a list
+    return response.data
 
-    return tasks
+def iter_all_tasks(user_id: str, columns: str = '*') -> Iterator[Dict[str, Any]]:
+    """
+    Stream a user's tasks from PostgREST, highest priority first, decoding rows as they arrive.
+
+    Unlike get_all_tasks, the response body is never held or parsed as a whole,
+    which keeps memory flat for users with very many tasks.
+
+    Args:
+        user_id: ID of the user whose tasks to retrieve
+        columns: Comma-separated columns to select
+
+    Yields:
+        Dict: One task dictionary at a time
+    """
+    params = {'select': columns, 'user_id': f'eq.{user_id}', 'order': 'priority_score.desc'}
+    rows = ijson.sendable_list()
+    parser = ijson.items_coro(rows, 'item', use_float=True)
+    with supabase.postgrest.session.stream('GET', '/tasks', params=params) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            parser.send(chunk)
+            yield from rows
+            del rows[:]
+    parser.close()
+    yield from rows
+
+def get_tasks_page(user_id: str, offset: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Retrieve one page of a user's tasks from Supabase, highest priority first.
+
+    Args:
+        user_id: ID of the user whose tasks to retrieve
+        offset: Index of the first task to return
+        limit: Maximum number of tasks to return
+
+    Returns:
+        Tuple containing:
+        - List of task dictionaries for the page
+        - Total number of tasks the user has
+    """
+    response = supabase.table('tasks').select(TASK_LIST_COLUMNS, count='exact').eq('user_id', user_id).order('priority_score', desc=True).range(offset, offset + limit - 1).execute()
+
+    return response.data, response.count or 0
 
 def get_task(task_id: str, user_id: str) -> Optional[Dict[str, Any]]:
     """
@@ -250,11 +384,7 @@ def get_task(task_id: str, user_id: str) -> Optional[Dict[str, Any]]:
     response = supabase.table('tasks').select('*').eq('id', task_id).eq('user_id', user_id).execute()
 
     if response.data and len(response.data) > 0:
-        task = response.data[0]
-        # Convert JSON string back to list for tags
-        if 'tags' in task and isinstance(task['tags'], str):
-            task['tags'] = json.loads(task['tags'])
-        return task
+        return response.data[0]
 
     return None
 
@@ -273,18 +403,47 @@ def update_task(task_id: str, task_data: Dict[str, Any], user_id: str) -> bool:
     # Prepare update data
     update_data = task_data.copy()
 
-    # Handle tags conversion
-    if 'tags' in update_data and isinstance(update_data['tags'], list):
-        update_data['tags'] = json.dumps(update_data['tags'])
-
     # Add updated timestamp
-    from datetime import datetime
     update_data['updated_at'] = datetime.now().isoformat()
 
     # Execute update
-    response = supabase.table('tasks').update(update_data).eq('id', task_id).eq('user_id', user_id).execute()
+    # Only the affected row count comes back, not the updated row
+    response = supabase.table('tasks').update(update_data, count='exact', returning=ReturnMethod.minimal).eq('id', task_id).eq('user_id', user_id).execute()
 
-    return len(response.data) > 0
+    return (response.count or 0) > 0
+
+def bulk_update_tasks(updates: Dict[str, Dict[str, Any]], user_id: str) -> int:
+    """
+    Apply several task updates with as few Supabase requests as possible.
+
+    Tasks receiving the same changes (e.g. all marked completed) are updated
+    together in a single request filtered on their IDs.
+
+    Args:
+        updates: Mapping of task ID to the fields to update on that task
+        user_id: ID of the user who owns the tasks
+
+    Returns:
+        int: Number of tasks updated
+    """
+    # Group task IDs by identical change sets (lists such as tags become tuples to be hashable)
+    groups = {}
+    for task_id, task_data in updates.items():
+        group_key = tuple(sorted(
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in task_data.items()
+        ))
+        groups.setdefault(group_key, []).append(task_id)
+
+    now = datetime.now().isoformat()
+    updated = 0
+    for group_key, task_ids in groups.items():
+        update_data = {key: list(value) if isinstance(value, tuple) else value for key, value in group_key}
+        update_data['updated_at'] = now
+        response = supabase.table('tasks').update(update_data, count='exact', returning=ReturnMethod.minimal).in_('id', task_ids).eq('user_id', user_id).execute()
+        updated += response.count or 0
+
+    return updated
 
 def delete_task(task_id: str, user_id: str) -> bool:
     """
@@ -297,9 +456,9 @@ def delete_task(task_id: str, user_id: str) -> bool:
     Returns:
         bool: True if deletion was successful, False otherwise
     """
-    response = supabase.table('tasks').delete().eq('id', task_id).eq('user_id', user_id).execute()
+    response = supabase.table('tasks').delete(count='exact', returning=ReturnMethod.minimal).eq('id', task_id).eq('user_id', user_id).execute()
 
-    return len(response.data) > 0
+    return (response.count or 0) > 0
 
 def toggle_task_completion(task_id: str, user_id: str) -> bool:
     """
@@ -312,17 +471,10 @@ def toggle_task_completion(task_id: str, user_id: str) -> bool:
     Returns:
         bool: True if toggle was successful, False otherwise
     """
-    # Get current task
-    task = get_task(task_id, user_id)
-
-    if not task:
-        return False
+    # Flip the status server-side in one statement (see toggle_task in supabase_setup.sql)
+    response = supabase.rpc('toggle_task', {'p_id': task_id, 'p_user': user_id}).execute()
 
-    # Toggle status
-    new_status = not task.get('completed', False)
-
-    # Update task
-    return update_task(task_id, {'completed': new_status}, user_id)
+    return response.data is not None
 
 def clear_all_tasks(user_id: str) -> int:
     """
@@ -334,14 +486,10 @@ def clear_all_tasks(user_id: str) -> int:
     Returns:
         int: Number of tasks deleted
     """
-    # First, get count of tasks
-    count_response = supabase.table('tasks').select('id', count='exact').eq('user_id', user_id).execute()
-    count = count_response.count if hasattr(count_response, 'count') else 0
-
-    # Delete all tasks for user
-    supabase.table('tasks').delete().eq('user_id', user_id).execute()
+    # Delete all tasks for user, with the deleted row count returned by the same request
+    response = supabase.table('tasks').delete(count='exact', returning=ReturnMethod.minimal).eq('user_id', user_id).execute()
 
-    return count
+    return response.count or 0
 
 # User preferences functions
 def get_user_preferences(user_id: str) -> Dict[str, Any]:
@@ -355,39 +503,40 @@ def get_user_preferences(user_id: str) -> Dict[str, Any]:
         Dict: User preferences
     """
     try:
-        print(f"Fetching preferences for user: {user_id}")
+        logger.debug("Fetching preferences for user: %s", user_id)
         response = supabase.table('user_preferences').select('*').eq('user_id', user_id).execute()
 
         if response.data and len(response.data) > 0:
-            print(f"Found existing preferences: {response.data[0]}")
+            logger.debug("Found existing preferences: %s", response.data[0])
             return response.data[0]
         else:
-            print(f"No preferences found for user {user_id}, creating default")
+            logger.debug("No preferences found for user %s, creating default", user_id)
             # Create default preferences if none exist
+            now = datetime.now().isoformat()
             default_prefs = {
                 'user_id': user_id,
                 'theme': 'default',
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
+                'created_at': now,
+                'updated_at': now
             }
 
             try:
                 save_response = supabase.table('user_preferences').insert(default_prefs).execute()
                 if save_response.data and len(save_response.data) > 0:
-                    print(f"Created default preferences: {save_response.data[0]}")
+                    logger.debug("Created default preferences: %s", save_response.data[0])
                     return save_response.data[0]
                 else:
-                    print(f"No data returned when creating preferences: {save_response}")
+                    logger.warning("No data returned when creating preferences: %s", save_response)
                     return default_prefs
             except Exception as insert_error:
-                print(f"Error creating default preferences: {str(insert_error)}")
+                logger.error("Error creating default preferences: %s", insert_error)
                 # Just return the default preferences without saving
                 return default_prefs
     except Exception as e:
-        print(f"Error getting user preferences: {str(e)}")
+        logger.error("Error getting user preferences: %s", e)
         # Print more detailed error information if available
         if hasattr(e, 'response') and hasattr(e.response, 'text'):
-            print(f"Response details: {e.response.text}")
+            logger.error("Response details: %s", e.response.text)
         # Return default preferences if there's an error
         return {'theme': 'default'}
 
@@ -407,41 +556,89 @@ def update_user_preferences(user_id: str, preferences: Dict[str, Any]) -> bool:
         update_data = preferences.copy()
         update_data['updated_at'] = datetime.now().isoformat()
 
-        # Check if preferences exist
-        check_response = supabase.table('user_preferences').select('id').eq('user_id', user_id).execute()
-
-        if check_response.data and len(check_response.data) > 0:
-            # Update existing preferences
-            response = supabase.table('user_preferences').update(update_data).eq('user_id', user_id).execute()
-        else:
-            # Create new preferences with explicit user_id
-            new_prefs = {
-                'user_id': user_id,
-                'theme': update_data.get('theme', 'default'),
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            }
-
-            # Print debug info
-            print(f"Creating new preferences for user {user_id}: {new_prefs}")
-
-            # Insert with explicit user_id
-            response = supabase.table('user_preferences').insert(new_prefs).execute()
+        # Insert or update in one request, relying on the unique user_id constraint
+        response = supabase.table('user_preferences').upsert(
+            {'user_id': user_id, **update_data},
+            on_conflict='user_id'
+        ).execute()
 
         if response.data and len(response.data) > 0:
-            print(f"Successfully updated preferences: {response.data}")
+            logger.debug("Successfully updated preferences: %s", response.data)
             return True
         else:
-            print(f"No data returned from preferences update: {response}")
+            logger.warning("No data returned from preferences update: %s", response)
             return False
     except Exception as e:
-        print(f"Error updating user preferences: {str(e)}")
+        logger.error("Error updating user preferences: %s", e)
         # Print more detailed error information if available
         if hasattr(e, 'response') and hasattr(e.response, 'text'):
-            print(f"Response details: {e.response.text}")
+            logger.error("Response details: %s", e.response.text)
         return False
 
 # Analytics functions
+def get_tasks_watermark(user_id: str) -> str:
+    """
+    Get a cheap marker that changes whenever a user's tasks change.
+
+    Combines the latest updated_at timestamp with the task count, so inserts,
+    updates and deletes all produce a new value.
+
+    Args:
+        user_id: ID of the user
+
+    Returns:
+        str: Watermark for the user's tasks; a fresh timestamp if it can't be read,
+            so cached stats are recomputed rather than served stale
+    """
+    try:
+        response = supabase.table('tasks').select('updated_at', count='exact').eq('user_id', user_id).order('updated_at', desc=True).limit(1).execute()
+        latest = response.data[0]['updated_at'] if response.data else ''
+        return f"{latest}|{response.count or 0}"
+    except Exception as e:
+        logger.error("Error getting tasks watermark: %s", e)
+        return datetime.now().isoformat()
+
+def _aggregate_task_stats(tasks: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate task statistics in a single pass, in the same shape the get_task_stats RPC returns.
+
+    Args:
+        tasks: Task dictionaries with completed, importance, due_date and created_at;
+            any iterable works, so tasks can be streamed
+
+    Returns:
+        Dict: Totals, importance and due date counts, and per-day completion rows
+    """
+    total_tasks = 0
+    completed_tasks = 0
+    importance_counts = Counter()
+    due_date_counts = Counter()
+    completion_by_date = {}
+    for task in tasks:
+        total_tasks += 1
+        completed = bool(task.get('completed'))
+        completed_tasks += completed
+        importance_counts[task.get('importance')] += 1
+        due_date = task.get('due_date')
+        if due_date:
+            due_date_counts[due_date] += 1
+        created_at = (task.get('created_at') or '').split('T')[0]  # Get just the date part
+        if created_at:
+            counts = completion_by_date.setdefault(created_at, [0, 0])
+            counts[0] += 1
+            counts[1] += completed
+
+    return {
+        'total_tasks': total_tasks,
+        'completed_tasks': completed_tasks,
+        'importance_counts': importance_counts,
+        'due_date_counts': dict(due_date_counts),
+        'completion_by_date': [
+            {'day': day, 'total': total, 'completed': done}
+            for day, (total, done) in sorted(completion_by_date.items())
+        ]
+    }
+
 def get_task_stats(user_id: str) -> Dict[str, Any]:
     """
     Get statistics about tasks for analytics.
@@ -453,49 +650,32 @@ def get_task_stats(user_id: str) -> Dict[str, Any]:
         Dict: Statistics about tasks
     """
     try:
-        # Get all tasks
-        tasks = get_all_tasks(user_id)
+        try:
+            # Aggregated server-side (see get_task_stats in supabase_setup.sql)
+            data = supabase.rpc('get_task_stats', {'p_user': user_id}).execute().data
+        except Exception as rpc_error:
+            # Fall back to aggregating client-side if the RPC hasn't been installed
+            logger.warning("get_task_stats RPC unavailable, aggregating client-side: %s", rpc_error)
+            data = _aggregate_task_stats(iter_all_tasks(user_id, columns='completed,importance,due_date,created_at'))
 
         # Calculate statistics
-        total_tasks = len(tasks)
-        completed_tasks = sum(1 for task in tasks if task.get('completed', False))
+        total_tasks = data['total_tasks']
+        completed_tasks = data['completed_tasks']
         open_tasks = total_tasks - completed_tasks
         completion_rate = (completed_tasks / total_tasks) * 100 if total_tasks > 0 else 0
 
-        # Group tasks by importance
+        # Task counts by importance
         importance_counts = {
-            'High': sum(1 for task in tasks if task.get('importance') == 'High'),
-            'Medium': sum(1 for task in tasks if task.get('importance') == 'Medium'),
-            'Low': sum(1 for task in tasks if task.get('importance') == 'Low')
+            level: data['importance_counts'].get(level, 0)
+            for level in ('High', 'Medium', 'Low')
         }
 
-        # Group tasks by due date (for calendar view)
-        tasks_by_date = {}
-        for task in tasks:
-            due_date = task.get('due_date')
-            if due_date:
-                if due_date not in tasks_by_date:
-                    tasks_by_date[due_date] = []
-                tasks_by_date[due_date].append(task)
-
-        # Calculate completion over time
-        # Group tasks by creation date
-        completion_by_date = {}
-        for task in tasks:
-            created_at = task.get('created_at', '').split('T')[0]  # Get just the date part
-            if created_at:
-                if created_at not in completion_by_date:
-                    completion_by_date[created_at] = {'total': 0, 'completed': 0}
-                completion_by_date[created_at]['total'] += 1
-                if task.get('completed', False):
-                    completion_by_date[created_at]['completed'] += 1
-
-        # Sort dates and convert to lists for charting
-        dates = sorted(completion_by_date.keys())
+        # Convert completion rows to lists for charting
+        completion_by_date = data['completion_by_date']
         completion_data = {
-            'dates': dates,
-            'total': [completion_by_date[date]['total'] for date in dates],
-            'completed': [completion_by_date[date]['completed'] for date in dates]
+            'dates': [row['day'] for row in completion_by_date],
+            'total': [row['total'] for row in completion_by_date],
+            'completed': [row['completed'] for row in completion_by_date]
         }
 
         return {
@@ -504,18 +684,18 @@ def get_task_stats(user_id: str) -> Dict[str, Any]:
             'open_tasks': open_tasks,
             'completion_rate': completion_rate,
             'importance_counts': importance_counts,
-            'tasks_by_date': tasks_by_date,
+            'due_date_counts': data['due_date_counts'],
             'completion_data': completion_data
         }
     except Exception as e:
-        print(f"Error getting task stats: {str(e)}")
+        logger.error("Error getting task stats: %s", e)
         return {
             'total_tasks': 0,
             'completed_tasks': 0,
             'open_tasks': 0,
             'completion_rate': 0,
             'importance_counts': {'High': 0, 'Medium': 0, 'Low': 0},
-            'tasks_by_date': {},
+            'due_date_counts': {},
             'completion_data': {'dates': [], 'total': [], 'completed': []}
         }
 
@@ -531,12 +711,29 @@ def get_tasks_by_date(user_id: str, date_str: str) -> List[Dict[str, Any]]:
         List[Dict]: List of tasks for the specified date
     """
     try:
-        # Get all tasks
-        all_tasks = get_all_tasks(user_id)
+        # Filter by due date server-side, backed by the (user_id, due_date) index
+        response = supabase.table('tasks').select(TASK_LIST_COLUMNS).eq('user_id', user_id).eq('due_date', date_str).order('priority_score', desc=True).execute()
 
-        # Filter tasks by due date
-        return [task for task in all_tasks if task.get('due_date') == date_str]
+        return response.data
     except Exception as e:
-        print(f"Error getting tasks by date: {str(e)}")
+        logger.error("Error getting tasks by date: %s", e)
         return []
 
+
+# Async variants for asyncio callers, so independent reads can be awaited together
+# with asyncio.gather; each runs the blocking client call in a worker thread
+async def async_get_tasks_page(user_id: str, offset: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+    """Async version of get_tasks_page."""
+    return await asyncio.to_thread(get_tasks_page, user_id, offset, limit)
+
+async def async_get_user_preferences(user_id: str) -> Dict[str, Any]:
+    """Async version of get_user_preferences."""
+    return await asyncio.to_thread(get_user_preferences, user_id)
+
+async def async_get_task_stats(user_id: str) -> Dict[str, Any]:
+    """Async version of get_task_stats."""
+    return await asyncio.to_thread(get_task_stats, user_id)
+
+async def async_get_current_user() -> Optional[Dict[str, Any]]:
+    """Async version of get_current_user."""
+    return await asyncio.to_thread(get_current_user)
@@ -4,7 +4,7 @@ CREATE TABLE IF NOT EXISTS tasks (
   user_id UUID NOT NULL,
   description TEXT NOT NULL,
   due_date TEXT,
-  tags TEXT,
+  tags JSONB DEFAULT '[]'::jsonb,
   importance TEXT,
   priority_score REAL,
   completed BOOLEAN DEFAULT FALSE,
@@ -12,6 +12,25 @@ CREATE TABLE IF NOT EXISTS tasks (
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Index per-user due date lookups used by the calendar view
+CREATE INDEX IF NOT EXISTS tasks_user_due_date_idx ON tasks (user_id, due_date);
+
+-- Index per-user priority ordering used by the task lists
+CREATE INDEX IF NOT EXISTS tasks_user_priority_idx ON tasks (user_id, priority_score DESC);
+
+-- Store tags as jsonb so PostgREST returns them already decoded (migrates older text columns)
+DO $$
+BEGIN
+  IF (SELECT data_type FROM information_schema.columns
+      WHERE table_name = 'tasks' AND column_name = 'tags') = 'text' THEN
+    ALTER TABLE tasks ALTER COLUMN tags TYPE JSONB USING COALESCE(NULLIF(tags, ''), '[]')::jsonb;
+    ALTER TABLE tasks ALTER COLUMN tags SET DEFAULT '[]'::jsonb;
+  END IF;
+END $$;
+
+-- Index tags for server-side tag filters
+CREATE INDEX IF NOT EXISTS tasks_tags_gin ON tasks USING GIN (tags);
+
 -- Create the user_preferences table if it doesn't exist
 CREATE TABLE IF NOT EXISTS user_preferences (
   id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -79,3 +98,57 @@ CREATE POLICY "Users can update their own preferences"
   ON user_preferences
   FOR UPDATE
   USING (auth.uid() = user_id);
+
+-- Flip a task's completion status in a single statement; returns NULL if the task doesn't exist
+CREATE OR REPLACE FUNCTION toggle_task(p_id UUID, p_user UUID)
+RETURNS BOOLEAN
+LANGUAGE sql
+AS $$
+  UPDATE tasks
+  SET completed = NOT COALESCE(completed, FALSE), updated_at = NOW()
+  WHERE id = p_id AND user_id = p_user
+  RETURNING completed;
+$$;
+
+GRANT EXECUTE ON FUNCTION toggle_task(UUID, UUID) TO authenticated;
+
+-- Aggregate a user's task statistics server-side so only summary rows cross the wire
+CREATE OR REPLACE FUNCTION get_task_stats(p_user UUID)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT json_build_object(
+    'total_tasks', (SELECT count(*) FROM tasks WHERE user_id = p_user),
+    'completed_tasks', (SELECT count(*) FROM tasks WHERE user_id = p_user AND completed),
+    'importance_counts', (
+      SELECT COALESCE(json_object_agg(importance, n), '{}'::json)
+      FROM (
+        SELECT importance, count(*) AS n FROM tasks
+        WHERE user_id = p_user AND importance IS NOT NULL
+        GROUP BY importance
+      ) i
+    ),
+    'due_date_counts', (
+      SELECT COALESCE(json_object_agg(due_date, n), '{}'::json)
+      FROM (
+        SELECT due_date, count(*) AS n FROM tasks
+        WHERE user_id = p_user AND due_date IS NOT NULL AND due_date <> ''
+        GROUP BY due_date
+      ) d
+    ),
+    'completion_by_date', (
+      SELECT COALESCE(json_agg(c ORDER BY c.day), '[]'::json)
+      FROM (
+        SELECT to_char(created_at, 'YYYY-MM-DD') AS day,
+               count(*) AS total,
+               count(*) FILTER (WHERE completed) AS completed
+        FROM tasks
+        WHERE user_id = p_user AND created_at IS NOT NULL
+        GROUP BY 1
+      ) c
+    )
+  );
+$$;
+
+GRANT EXECUTE ON FUNCTION get_task_stats(UUID) TO authenticated;
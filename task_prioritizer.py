@@ -1,10 +1,21 @@
 import os
-from typing import List, Dict, Annotated, Sequence
+import re
+import asyncio
+import functools
+import threading
+import traceback
+import orjson
+import openai
+from operator import itemgetter
+from typing import List, Dict, Annotated, Sequence, Union
 from typing_extensions import TypedDict  # Use typing_extensions instead of typing
 from datetime import datetime
 
 # Import necessary packages
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.globals import set_llm_cache
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_community.cache import SQLiteCache
 from pydantic import BaseModel, Field  # Import directly from pydantic
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END
@@ -13,6 +24,16 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Persist LLM responses so repeated inputs (e.g. Streamlit reruns) skip the API call
+set_llm_cache(SQLiteCache(database_path=os.getenv("LLM_CACHE_PATH", ".task_prioritizer.db")))
+
+def _normalize_input(user_input):
+    """Strip indentation and blank lines so equivalent inputs share a cache entry."""
+    return "\n".join(line.strip() for line in user_input.splitlines() if line.strip())
+
+# Hashtags in a free-text tags string
+_HASHTAG = re.compile(r'#(\w+)')
+
 # Define our task structure
 class TaskItem(TypedDict):
     description: str
@@ -21,6 +42,17 @@ class TaskItem(TypedDict):
     importance: str
     priority_score: float
 
+# Schema the LLM fills in directly via structured output
+class ParsedTask(BaseModel):
+    description: str = Field(..., description="Task description")
+    due_date: str = Field("", description="Due date for the task, if provided")
+    tags: Union[List[str], str] = Field([], description="Tags associated with the task, without the #")
+    importance: str = Field("", description="Importance level (High, Medium, Low)")
+    priority_score: float = Field(5.0, description="Priority score from 1-10 (10 being highest priority)")
+
+class TaskList(BaseModel):
+    tasks: List[ParsedTask]
+
 # Define our application state
 class TaskPrioritizerState(TypedDict):
     tasks: List[TaskItem]
@@ -30,275 +62,141 @@ class TaskPrioritizerState(TypedDict):
     errors: List[str]
     output: str
 
-# Initialize the LLM (Language Model)
-llm = ChatOpenAI(model="gpt-3.5-turbo")
+# Initialize the LLMs (Language Models). Scoring is the only step that needs the stronger
+# model; formatting is template-like work a smaller, faster model handles well.
+# Temperature 0 keeps scoring output stable, which also makes it cache-friendly.
+_PRIORITIZER_LLM = ChatOpenAI(model="gpt-4o", temperature=0)
+_FORMAT_LLM = ChatOpenAI(model="gpt-4o-mini", temperature=0.2, max_tokens=800)
+
+# Bind the TaskList schema so responses come back as validated objects instead of raw text
+structured_llm = _PRIORITIZER_LLM.with_structured_output(TaskList, method="function_calling")
+
+# System prompts are fixed and always sent first, so the provider can reuse its cached prefix.
+# Parse and prioritize share one prompt so the task list is only sent once.
+_PARSE_PROMPT = """Parse the user's tasks. For each, extract the description, due date (if given) and tags (words prefixed with #), then assign:
+- importance: High, Medium or Low
+- priority_score: 1-10, 10 highest
+Raise priority for near due dates, tags like #urgent or #important, and urgent wording."""
+
+_FORMAT_PROMPT = """Present the prioritized tasks to the user in clear markdown, with a short summary of why they were prioritized this way.
+Tasks are a JSON array with short keys: d=description, due=due date, tags=tags, imp=importance, score=priority score (1-10)."""
+
+# Built once so each call only constructs its HumanMessage
+_PARSE_SYS = SystemMessage(content=_PARSE_PROMPT)
+_FORMAT_SYS = SystemMessage(content=_FORMAT_PROMPT)
+
+def _normalize_tags(tags):
+    """Turn a tags value into a list, splitting comma lists or extracting hashtags from a string."""
+    if not isinstance(tags, str):
+        return tags
+    if ',' in tags:
+        return [tag.strip() for tag in tags.split(",") if tag.strip()]
+    # Use the whole string as a single tag when it has no hashtags
+    return _HASHTAG.findall(tags) or [tags]
+
+def _parse_request(user_input):
+    """User message for the combined parse-and-prioritize call."""
+    return f"Parse and prioritize these tasks: {_normalize_input(user_input)}"
+
+def _task_dicts(task_list):
+    """Convert a TaskList into state task dicts."""
+    # Build plain dicts directly; TaskItem is a TypedDict, so calling it only adds overhead
+    return [
+        {
+            "description": task.description,
+            "due_date": task.due_date,
+            "tags": _normalize_tags(task.tags),
+            "importance": task.importance,
+            "priority_score": task.priority_score
+        }
+        for task in task_list.tasks
+    ]
 
 # Define the task parsing function
-def parse_tasks(state):
-    """Parse the user input into structured task items."""
-    # Create a copy of the state so we don't modify the original
-    new_state = state.copy()
-
+async def parse_tasks(state):
+    """Parse the user input into structured, scored task items in a single LLM call."""
+    # Nodes return only the keys they change; LangGraph merges them into the state
     if not state["user_input"]:
-        new_state["errors"].append("No tasks provided.")
-        return new_state
-
-    # Create a prompt for the AI to parse tasks
-    system_prompt = """
-    You are a task parser. Parse the user's input into a list of tasks.
-    Extract the task description, due date (if provided), and any tags (prefixed with #).
-    Return the tasks as a list of JSON objects.
-    """
-
-    messages = [
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=f"Parse these tasks: {state['user_input']}")
-    ]
+        return {"errors": state["errors"] + ["No tasks provided."]}
 
-    # Get response from the language model
-    response = llm.invoke(messages)
+    messages = [_PARSE_SYS, HumanMessage(content=_parse_request(state["user_input"]))]
 
     try:
-        import json
-        import re
-
-        # Get the response content
-        content = response.content
-
-        # Debug information
-        debug_info = f"\nResponse type: {type(response)}\nContent type: {type(content)}\nContent length: {len(content)}"
-
-        # Try to extract JSON from the response if it's not already valid JSON
-        json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', content)
-        if json_match:
-            # Found JSON in code block
-            content = json_match.group(1).strip()
-        else:
-            # Try to find JSON array directly
-            json_match = re.search(r'\[\s*{[\s\S]*}\s*\]', content)
-            if json_match:
-                content = json_match.group(0)
-
-        # Extract tasks from AI response
-        try:
-            tasks_data = json.loads(content)
-        except json.JSONDecodeError as json_err:
-            # If still failing, try a more aggressive approach to fix common JSON issues
-            fixed_content = content.replace("'", '"')  # Replace single quotes with double quotes
-            fixed_content = re.sub(r'([{,])\s*(\w+)\s*:', r'\1"\2":', fixed_content)  # Add quotes to keys
-
-            try:
-                tasks_data = json.loads(fixed_content)
-            except json.JSONDecodeError:
-                # If still failing, raise a more detailed error
-                error_msg = f"JSON parsing failed: {str(json_err)}\nRaw content: {content[:100]}...{debug_info}"
-                raise ValueError(error_msg)
-
-        # Validate tasks_data is a list
-        if not isinstance(tasks_data, list):
-            raise TypeError(f"Expected a list of tasks, got {type(tasks_data)}")
-
-        # Format tasks properly
-        parsed_tasks = []
-        for task in tasks_data:
-            # Ensure task is a dictionary
-            if not isinstance(task, dict):
-                raise TypeError(f"Expected dictionary for task, got {type(task)}")
-
-            # Ensure tags is a list
-            tags = task.get("tags", [])
-            if not isinstance(tags, list):
-                if isinstance(tags, str):
-                    # Convert comma-separated string to list or extract hashtags
-                    if ',' in tags:
-                        tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
-                    else:
-                        # Extract hashtags
-                        hashtags = re.findall(r'#(\w+)', tags)
-                        if hashtags:
-                            tags = hashtags
-                        else:
-                            tags = [tags]  # Use the whole string as a single tag
-                else:
-                    tags = []
-
-            parsed_task = TaskItem(
-                description=task.get("description", ""),
-                due_date=task.get("due_date", ""),
-                tags=tags,
-                importance="",  # Will be filled in later
-                priority_score=0.0  # Will be filled in later
-            )
-            parsed_tasks.append(parsed_task)
-
-        new_state["tasks"] = parsed_tasks
-        new_state["current_step"] = "tasks_parsed"
+        # Get a validated TaskList from the language model
+        result = await structured_llm.ainvoke(messages)
+        tasks = _task_dicts(result)
     except Exception as e:
-        import traceback
         error_trace = traceback.format_exc()
         error_msg = f"Failed to parse tasks: {str(e)}\nTrace: {error_trace[:500]}"
-        new_state["errors"].append(error_msg)
+        return {"errors": state["errors"] + [error_msg]}
 
-    return new_state
+    return {"tasks": tasks, "current_step": "tasks_parsed"}
 
 # Define the prioritization function
-def prioritize_tasks(state):
-    """Analyze and prioritize the tasks based on various factors."""
-    new_state = state.copy()
-
+async def prioritize_tasks(state):
+    """Order the tasks scored by parse_tasks, highest priority first."""
     if not state["tasks"]:
-        new_state["errors"].append("No tasks to prioritize.")
-        return new_state
-
-    system_prompt = """
-    You are a task prioritization expert. Your job is to analyze tasks and assign:
-    1. An importance level (High, Medium, Low)
-    2. A priority score from 1-10 (10 being highest priority)
-
-    Consider the following factors:
-    - Due date: more urgent dates should have higher priority
-    - Tags: certain tags like #urgent or #important should increase priority
-    - Task description: look for keywords indicating importance or urgency
+        return {"errors": state["errors"] + ["No tasks to prioritize."]}
+
+    # Scores were assigned during parsing, so this step is a local sort with no LLM call
+    prioritized_tasks = list(state["tasks"])
+    prioritized_tasks.sort(key=itemgetter("priority_score"), reverse=True)
+
+    return {"prioritized_tasks": prioritized_tasks, "current_step": "tasks_prioritized"}
+
+def _render_markdown(tasks):
+    """Render prioritized tasks as markdown, highest priority first."""
+    lines = ["## Your Prioritized Tasks", ""]
+    for t in tasks:
+        lines.append(f"### {t['importance'] or 'Unrated'} — {t['description']}")
+        lines.append(f"- Due: {t['due_date'] or 'No due date'}")
+        lines.append(f"- Priority: {t['priority_score']:g}/10")
+        if t["tags"]:
+            lines.append(f"- Tags: {', '.join(t['tags'])}")
+        lines.append("")
+    return "\n".join(lines)
 
-    Return the tasks in JSON format with added importance and priority_score fields.
+# Function to format the final output
+async def format_output(state, config=None):
     """
+    Format the prioritized tasks into a readable output.
 
-    messages = [
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=f"Prioritize these tasks: {state['tasks']}")
-    ]
-
-    response = llm.invoke(messages)
-
-    try:
-        import json
-        import re
-
-        # Get the response content
-        content = response.content
-
-        # Debug information
-        debug_info = f"\nResponse type: {type(response)}\nContent type: {type(content)}\nContent length: {len(content)}"
-
-        # Try to extract JSON from the response if it's not already valid JSON
-        # Sometimes the LLM might wrap the JSON in markdown code blocks or add extra text
-        json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', content)
-        if json_match:
-            # Found JSON in code block
-            content = json_match.group(1).strip()
-        else:
-            # Try to find JSON array directly
-            json_match = re.search(r'\[\s*{[\s\S]*}\s*\]', content)
-            if json_match:
-                content = json_match.group(0)
-
-        # Extract prioritized tasks from AI response
-        try:
-            prioritized_tasks_data = json.loads(content)
-        except json.JSONDecodeError as json_err:
-            # If still failing, try a more aggressive approach to fix common JSON issues
-            fixed_content = content.replace("'", '"')  # Replace single quotes with double quotes
-            fixed_content = re.sub(r'([{,])\s*(\w+)\s*:', r'\1"\2":', fixed_content)  # Add quotes to keys
-
-            try:
-                prioritized_tasks_data = json.loads(fixed_content)
-            except json.JSONDecodeError:
-                # If still failing, raise a more detailed error
-                error_msg = f"JSON parsing failed: {str(json_err)}\nRaw content: {content[:100]}...{debug_info}"
-                raise ValueError(error_msg)
-
-        # Format tasks properly
-        prioritized_tasks = []
-        for task in prioritized_tasks_data:
-            # Ensure task is a dictionary
-            if not isinstance(task, dict):
-                raise TypeError(f"Expected dictionary for task, got {type(task)}")
-
-            # Get priority score with fallback and validation
-            try:
-                priority_score = float(task.get("priority_score", 0))
-            except (ValueError, TypeError):
-                priority_score = 5.0  # Default to middle priority if invalid
-
-            # Ensure tags is a list
-            tags = task.get("tags", [])
-            if not isinstance(tags, list):
-                if isinstance(tags, str):
-                    # Convert comma-separated string to list
-                    tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
-                else:
-                    tags = []
-
-            prioritized_task = TaskItem(
-                description=task.get("description", ""),
-                due_date=task.get("due_date", ""),
-                tags=tags,
-                importance=task.get("importance", ""),
-                priority_score=priority_score
-            )
-            prioritized_tasks.append(prioritized_task)
-
-        # Sort by priority score (descending)
-        prioritized_tasks.sort(key=lambda x: x["priority_score"], reverse=True)
-
-        new_state["prioritized_tasks"] = prioritized_tasks
-        new_state["current_step"] = "tasks_prioritized"
-    except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        error_msg = f"Failed to prioritize tasks: {str(e)}\nTrace: {error_trace[:500]}"
-        new_state["errors"].append(error_msg)
-
-    return new_state
-
-# Function to format the final output
-def format_output(state):
-    """Format the prioritized tasks into a readable output."""
-    new_state = state.copy()
-
-    system_prompt = """
-    You are a personal assistant presenting prioritized tasks.
-    Format the list of prioritized tasks in a clear, organized way.
-    Include a helpful summary of why tasks were prioritized as they were.
-    Use markdown for formatting to make it easy to read.
+    The markdown is rendered locally unless the run is configured with
+    {"configurable": {"llm_polish": True}}, which asks the model for a narrative
+    presentation with a summary of the prioritization instead.
     """
+    if not ((config or {}).get("configurable") or {}).get("llm_polish"):
+        return {"output": _render_markdown(state["prioritized_tasks"]), "current_step": "output_formatted"}
 
-    messages = [
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=f"Format these prioritized tasks for presentation to the user: {state['prioritized_tasks']}")
-    ]
+    # Compact JSON with short keys costs far fewer tokens than the Python repr of each dict
+    payload = orjson.dumps([
+        {"d": t["description"], "due": t["due_date"], "tags": t["tags"], "imp": t["importance"], "score": t["priority_score"]}
+        for t in state["prioritized_tasks"]
+    ]).decode()
+
+    messages = [_FORMAT_SYS, HumanMessage(content=f"Format these prioritized tasks for presentation to the user: {payload}")]
 
-    response = llm.invoke(messages)
-    new_state["output"] = response.content
-    new_state["current_step"] = "output_formatted"
+    response = await _FORMAT_LLM.ainvoke(messages)
+    return {"output": response.content, "current_step": "output_formatted"}
 
-    return new_state
+# Next node for each step that continues the pipeline; anything else ends the run
+_NEXT_NODE = {
+    "tasks_parsed": "prioritize_tasks",
+    "tasks_prioritized": "format_output",
+}
 
 # Define router function to determine next steps
 def router(state):
     if state["errors"]:
         return "handle_errors"
-
-    current_step = state.get("current_step", "")
-
-    # We no longer need to check for empty current_step since we set an entry point
-    if current_step == "tasks_parsed":
-        return "prioritize_tasks"
-    elif current_step == "tasks_prioritized":
-        return "format_output"
-    else:
-        return END
+    return _NEXT_NODE.get(state["current_step"], END)
 
 # Function to handle errors
-def handle_errors(state):
-    new_state = state.copy()
-
-    error_message = "The following errors occurred:\n" + "\n".join(state["errors"])
-    new_state["output"] = error_message
+async def handle_errors(state):
+    return {"output": "The following errors occurred:\n" + "\n".join(state["errors"])}
 
-    return new_state
-
-# Build the graph
+# Build the graph once; the compiled graph holds no per-run state and is reused across calls
+@functools.lru_cache(maxsize=1)
 def build_task_prioritizer_graph():
     # Initialize the graph
     workflow = StateGraph(TaskPrioritizerState)
@@ -313,19 +211,15 @@ def build_task_prioritizer_graph():
     workflow.set_entry_point("parse_tasks")
     workflow.add_conditional_edges("parse_tasks", router)
     workflow.add_conditional_edges("prioritize_tasks", router)
-    workflow.add_conditional_edges("format_output", lambda _: END)
-    workflow.add_conditional_edges("handle_errors", lambda _: END)
+    workflow.add_edge("format_output", END)
+    workflow.add_edge("handle_errors", END)
 
     # Compile the graph
     return workflow.compile()
 
-# Function to run the Task Prioritizer
-def run_task_prioritizer(user_input):
-    # Initialize the graph
-    graph = build_task_prioritizer_graph()
-
-    # Initialize the state
-    initial_state = TaskPrioritizerState(
+# Build the starting state for one run
+def _initial_state(user_input):
+    return TaskPrioritizerState(
         tasks=[],
         prioritized_tasks=[],
         user_input=user_input,
@@ -334,56 +228,215 @@ def run_task_prioritizer(user_input):
         output=""
     )
 
-    # Run the graph
-    outputs = []
-    for output_step in graph.stream(initial_state):
-        outputs.append(output_step)
-
-    # Get the final state from the last output
-    if not outputs:
-        raise ValueError("No outputs generated from the graph execution. Check your graph configuration.")
-
-    final_output = outputs[-1]  # Get the last output
-
-    try:
-        # Handle different output structures that might come from LangGraph
-        if hasattr(final_output, 'values') and callable(final_output.values):
-            # If values is a method, call it
-            values = final_output.values()
-            if values and len(list(values)) > 0:
-                # Convert dict_values to list before accessing
-                final_state = list(values)[0]
-            else:
-                raise ValueError("No values returned from final_output.values()")
-        elif isinstance(final_output, dict):
-            # If it's a dictionary, check for known keys
-            if 'handle_errors' in final_output:
-                # This is the error state, use it directly
-                final_state = final_output['handle_errors']
-            elif 'format_output' in final_output:
-                # This is the output state, use it directly
-                final_state = final_output['format_output']
-            elif len(final_output) == 1:
-                # If there's only one key, use its value
-                final_state = list(final_output.values())[0]
-            else:
-                # Just use the whole dict as the state
-                final_state = final_output
-        else:
-            # Try to convert to dict if possible
-            final_state = dict(final_output)
-    except (AttributeError, TypeError, IndexError, ValueError) as e:
-        error_msg = f"Error accessing final state: {str(e)}\nOutput type: {type(final_output)}\nOutput value: {final_output}"
-        raise RuntimeError(error_msg)
-
-    # Store prioritized tasks in session state if available
+# Store prioritized tasks in session state if available
+def _store_prioritized_tasks(final_state):
     import streamlit as st
     if "prioritized_tasks" in final_state and final_state["prioritized_tasks"]:
         st.session_state.prioritized_tasks = final_state["prioritized_tasks"]
 
+# Run config selecting how format_output renders
+def _run_config(llm_polish):
+    return {"configurable": {"llm_polish": llm_polish}}
+
+# Run one input through a compiled graph and return its final state; progressive
+# output goes through astream_task_prioritizer instead
+async def _arun_graph(graph, user_input, llm_polish=False):
+    return await graph.ainvoke(_initial_state(user_input), _run_config(llm_polish))
+
+# The module-level ChatOpenAI clients pool their connections on whichever event loop
+# first uses them, so synchronous callers share one long-lived background loop rather
+# than creating and closing a loop per call
+_loop = None
+_loop_lock = threading.Lock()
+
+def _background_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="task-prioritizer-loop", daemon=True).start()
+    return _loop
+
+def _run_sync(coro):
+    """Run a coroutine on the background loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+# Async entry point for the Task Prioritizer
+async def arun_task_prioritizer(user_input, llm_polish=False):
+    # Initialize the graph
+    graph = build_task_prioritizer_graph()
+
+    final_state = await _arun_graph(graph, user_input, llm_polish)
+    _store_prioritized_tasks(final_state)
+
     # Return both the final output and the graph object
     return final_state.get("output", "No output generated."), graph
 
+# Function to run the Task Prioritizer
+def run_task_prioritizer(user_input, llm_polish=False):
+    graph = build_task_prioritizer_graph()
+
+    final_state = _run_sync(_arun_graph(graph, user_input, llm_polish))
+    # Stored from the calling thread, which is the one holding the Streamlit session
+    _store_prioritized_tasks(final_state)
+
+    return final_state.get("output", "No output generated."), graph
+
+# Yield the formatted output of one run, leaving the final state in final_state
+async def _astream_output(user_input, llm_polish, final_state):
+    graph = build_task_prioritizer_graph()
+    streamed = False
+
+    # "messages" carries LLM tokens from inside nodes, "values" the state after each step
+    async for mode, chunk in graph.astream(_initial_state(user_input), _run_config(llm_polish), stream_mode=["messages", "values"]):
+        if mode == "values":
+            final_state.update(chunk)
+            continue
+        message, metadata = chunk
+        if metadata.get("langgraph_node") == "format_output" and message.content:
+            streamed = True
+            yield message.content
+
+    # Errors and locally rendered output arrive whole
+    if not streamed:
+        yield final_state.get("output", "No output generated.")
+
+# Async streaming entry point for the Task Prioritizer
+async def astream_task_prioritizer(user_input, llm_polish=False):
+    """
+    Run the Task Prioritizer, yielding the formatted output as it is generated.
+
+    Args:
+        user_input: Raw user input with tasks
+        llm_polish: Have the model write the output with a summary instead of
+            rendering the markdown locally; only then does output arrive in pieces
+
+    Yields:
+        str: Chunks of the formatted output, or the error report if the run failed
+    """
+    final_state = {}
+    async for text in _astream_output(user_input, llm_polish, final_state):
+        yield text
+
+    _store_prioritized_tasks(final_state)
+
+# Streaming entry point for synchronous callers such as st.write_stream
+def stream_task_prioritizer(user_input, llm_polish=False):
+    final_state = {}
+    chunks = _astream_output(user_input, llm_polish, final_state)
+    try:
+        while True:
+            try:
+                yield _run_sync(chunks.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        _run_sync(chunks.aclose())
+
+    # Stored from the calling thread, which is the one holding the Streamlit session
+    _store_prioritized_tasks(final_state)
+
+async def _arun_batch(inputs):
+    graph = build_task_prioritizer_graph()
+    # Independent inputs share one event loop, so their LLM calls overlap
+    states = await asyncio.gather(*(_arun_graph(graph, user_input) for user_input in inputs))
+    return [state.get("output", "No output generated.") for state in states]
+
+# How often to check on a submitted OpenAI batch
+BATCH_POLL_SECONDS = 30
+
+async def _finish_batch_item(user_input, body):
+    """Run prioritize/format on one Batch API response, mirroring the graph's error handling."""
+    state = _initial_state(user_input)
+    try:
+        if body is None:
+            raise ValueError("No response returned for this input.")
+        arguments = body["choices"][0]["message"]["tool_calls"][0]["function"]["arguments"]
+        state["tasks"] = _task_dicts(TaskList.model_validate_json(arguments))
+    except Exception as e:
+        state["errors"] = [f"Failed to parse tasks: {str(e)}"]
+
+    for node in (prioritize_tasks, format_output):
+        if state["errors"]:
+            break
+        state.update(await node(state))
+
+    if state["errors"]:
+        state.update(await handle_errors(state))
+    return state["output"]
+
+async def _arun_openai_batch(inputs):
+    client = openai.AsyncOpenAI()
+    tool = convert_to_openai_tool(TaskList)
+
+    # One parse-and-prioritize request per input, keyed by its position
+    requests = b"\n".join(
+        orjson.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": _PRIORITIZER_LLM.model_name,
+                "temperature": _PRIORITIZER_LLM.temperature,
+                "messages": [
+                    {"role": "system", "content": _PARSE_PROMPT},
+                    {"role": "user", "content": _parse_request(user_input)}
+                ],
+                "tools": [tool],
+                "tool_choice": {"type": "function", "function": {"name": tool["function"]["name"]}}
+            }
+        })
+        for i, user_input in enumerate(inputs)
+    )
+
+    batch_file = await client.files.create(file=("tasks.jsonl", requests), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+    # Wait for the batch to reach a terminal state
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        await asyncio.sleep(BATCH_POLL_SECONDS)
+        batch = await client.batches.retrieve(batch.id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"OpenAI batch {batch.id} ended with status {batch.status}")
+
+    # Map each result line back to its input; failed requests have no response body
+    bodies = {}
+    output = await client.files.content(batch.output_file_id)
+    for line in output.text.splitlines():
+        if line:
+            result = orjson.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") == 200:
+                bodies[result["custom_id"]] = response["body"]
+
+    return await asyncio.gather(*(
+        _finish_batch_item(user_input, bodies.get(str(i)))
+        for i, user_input in enumerate(inputs)
+    ))
+
+# Function to run the Task Prioritizer over many inputs at once
+def run_task_prioritizer_batch(inputs, batch=False):
+    """
+    Prioritize several independent task lists concurrently.
+
+    Args:
+        inputs: Raw user inputs, one task list each
+        batch: If True, submit the parse step through the OpenAI Batch API instead of
+            calling the model directly. This is cheaper for large offline runs, but results
+            can take up to 24 hours, so keep it off for interactive use.
+
+    Returns:
+        List[str]: Formatted output for each input, in the same order
+    """
+    if batch:
+        return _run_sync(_arun_openai_batch(inputs))
+    return _run_sync(_arun_batch(inputs))
+
 # Example usage
 if __name__ == "__main__":
     example_input = """